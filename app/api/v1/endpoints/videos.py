@@ -1,24 +1,39 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, BackgroundTasks, Query, status
+from fastapi.responses import FileResponse, ORJSONResponse, Response
 from pathlib import Path
 from typing import Optional
 import json
 import asyncio
+import time
 
 from app.schemas import (
     CaptionConfig,
     CaptionStyle,
     CaptionPosition,
+    CaptionOutputMode,
     TaskResponse,
     TaskStatus,
     EditTranscriptionRequest,
+    BatchRenderRequest,
+    SubtitleFormat,
+    FramePreviewRequest,
+    TranscriptionLayout,
+    TranscriptionPatchRequest,
+    TranscriptionProfile,
 )
 from app.models import TaskStatusEnum
 from app.services.storage import get_storage_service
 from app.services.task_manager import get_task_manager
 from app.services.task_manager import get_task_manager
 from app.services.orchestrator import get_caption_orchestrator
-from app.services.video_processor import get_video_processor, CaptionStyler
+from app.services.video_processor import get_video_processor, VideoProcessor
+from app.services.subtitles import CaptionStyler
+from app.services.media_probe import get_media_probe_cache
+from app.services.caption_export import get_caption_exporter
+from app.services.frame_preview import get_frame_previewer
+from app.services.transcription import TranscriptionService
+from app.services.transcription_edits import apply_operations
+from app.services.transcription_codec import get_transcription_encoder
 from app.core.config import get_settings
 from app.core.logging import get_logger
 from app.core.exceptions import (
@@ -26,6 +41,7 @@ from app.core.exceptions import (
     FileTooLargeError,
     TaskNotFoundError,
     VideoNotFoundError,
+    VideoProcessingError,
 )
 
 logger = get_logger(__name__)
@@ -43,6 +59,13 @@ def validate_file(file: UploadFile) -> None:
             )
 
 
+def _transcription_source(segments, original_task) -> dict:
+    if segments is not None:
+        return {}
+    # Pin the version rendered; later PATCHes to the original do not affect this task.
+    return {"transcription_source": {"task_id": original_task.id, "version": original_task.transcription_version}}
+
+
 @router.post(
     "/caption",
     response_model=TaskResponse,
@@ -62,8 +85,18 @@ async def create_captioned_video(
     highlight_color: str = Form(default="#FFFF00"),
     highlight_current_word: bool = Form(default=True),
     max_words_per_line: int = Form(default=5, ge=1, le=15),
+    transcription_profile: Optional[TranscriptionProfile] = Form(default=None),
+    language: Optional[str] = Form(default=None, min_length=2, max_length=16),
+    start: Optional[float] = Form(default=None, ge=0, description="Caption only from this time (seconds)"),
+    end: Optional[float] = Form(default=None, gt=0, description="Caption only up to this time (seconds)"),
 ):
     validate_file(video)
+
+    if start is not None and end is not None and end <= start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end must be greater than start"
+        )
     
     config = CaptionConfig(
         style=style,
@@ -82,20 +115,56 @@ async def create_captioned_video(
     orchestrator = get_caption_orchestrator()
     
     video_path = await storage.save_upload(video.file, video.filename)
+
+    try:
+        media_info = await get_media_probe_cache().probe(video_path)
+    except VideoProcessingError as e:
+        logger.warning("upload_probe_failed", filename=video.filename, error=e.message)
+        await storage.delete_file(video_path)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file is not a readable video"
+        )
+
+    clip_start = clip_end = None
+    if start or end is not None:
+        if (start or 0.0) >= media_info.duration:
+            await storage.delete_file(video_path)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"start is past the end of the video ({media_info.duration:.3f}s)"
+            )
+        clip_start = start or None
+        clip_end = min(end, media_info.duration) if end is not None else media_info.duration
+    
+    profile = TranscriptionService.resolve_profile(transcription_profile)
     
     task = await task_manager.create_task(
         input_path=str(video_path),
-        caption_config=config.model_dump()
+        caption_config=config.model_dump(),
+        transcription_profile=profile.value,
+        language=language,
+        clip_start=clip_start,
+        clip_end=clip_end,
+        metadata={"media": media_info.summary()}
     )
     
     background_tasks.add_task(
         orchestrator.process_video,
         task.id,
         video_path,
-        config
+        config,
+        profile,
+        language
     )
     
-    logger.info("caption_task_created", task_id=task.id, filename=video.filename)
+    logger.info(
+        "caption_task_created",
+        task_id=task.id,
+        filename=video.filename,
+        clip_start=clip_start,
+        clip_end=clip_end
+    )
     
     return TaskResponse(
         task_id=task.id,
@@ -104,6 +173,8 @@ async def create_captioned_video(
         message="Video upload successful. Processing started.",
         created_at=task.created_at,
         updated_at=task.updated_at,
+        clip_start=task.clip_start,
+        clip_end=task.clip_end,
     )
 
 
@@ -132,6 +203,12 @@ async def get_task_status(task_id: str):
         updated_at=task.updated_at,
         result_url=task.result_url,
         error=task.error,
+        transcription_profile=task.transcription_profile,
+        render_profile=task.render_profile,
+        output_mode=task.output_mode,
+        clip_start=task.clip_start,
+        clip_end=task.clip_end,
+        metadata=task.metadata,
     )
 
 
@@ -184,6 +261,46 @@ async def get_caption_styles():
             for style in CaptionStyle
         ],
         "positions": [pos.value for pos in CaptionPosition],
+        "transcription_profiles": [profile.value for profile in TranscriptionProfile],
+        "output_presets": [
+            {"name": preset.value, "width": width, "height": height, "fps": fps}
+            for preset, (width, height, fps) in VideoProcessor.OUTPUT_PRESETS.items()
+        ],
+    }
+
+
+@router.get(
+    "/search",
+    response_class=ORJSONResponse,
+    summary="Search transcriptions",
+    description="Find a word or phrase across all stored transcriptions; a trailing * makes a word a prefix"
+)
+async def search_transcriptions(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=50, ge=1, le=500),
+    include_derived: bool = Query(default=False, description="Also search reprocessed copies of transcriptions"),
+):
+    task_manager = get_task_manager()
+    started = time.perf_counter()
+    hits, truncated = task_manager.search_index.search(q, limit=limit, include_derived=include_derived)
+
+    results = []
+    for hit in hits:
+        task = await task_manager.get_task(hit.task_id)
+        results.append({
+            "task_id": hit.task_id,
+            "segment": hit.segment,
+            "start": hit.start,
+            "end": hit.end,
+            "text": hit.text,
+            "segment_text": task.transcription.segments[hit.segment].text,
+        })
+
+    return {
+        "query": q,
+        "hits": results,
+        "truncated": truncated,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
     }
 
 
@@ -192,7 +309,60 @@ async def get_caption_styles():
     summary="Get transcription for a task",
     description="Retrieve the transcription data from a completed task for editing"
 )
-async def get_task_transcription(task_id: str):
+async def get_task_transcription(
+    task_id: str,
+    layout: TranscriptionLayout = Query(
+        default=TranscriptionLayout.ROWS,
+        description="rows: one object per segment; columns: parallel arrays of segment and word fields"
+    ),
+    start: Optional[float] = Query(default=None, ge=0, description="Only segments and words after this time"),
+    end: Optional[float] = Query(default=None, gt=0, description="Only segments and words before this time"),
+    accept_encoding: Optional[str] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None),
+):
+    task_manager = get_task_manager()
+    task = await task_manager.get_task(task_id)
+
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} not found"
+        )
+
+    if not task.transcription:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No transcription available for this task"
+        )
+
+    encoder = get_transcription_encoder()
+    if start is None and end is None:
+        encoded = await encoder.encode(task, layout, accept_encoding)
+    else:
+        start = start or 0.0
+        end = end if end is not None else float("inf")
+        if end <= start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="end must be greater than start"
+            )
+        encoded = encoder.encode_window(task, start, end, layout, accept_encoding)
+    headers = {"ETag": encoded.etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if if_none_match and encoded.etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoded.encoding:
+        headers["Content-Encoding"] = encoded.encoding
+    return Response(content=encoded.body, media_type="application/json", headers=headers)
+
+
+@router.patch(
+    "/tasks/{task_id}/transcription",
+    response_class=ORJSONResponse,
+    summary="Edit a stored transcription",
+    description="Apply text, timing, split/merge and offset operations to the stored transcription"
+)
+async def patch_task_transcription(task_id: str, request: TranscriptionPatchRequest):
     task_manager = get_task_manager()
     task = await task_manager.get_task(task_id)
 
@@ -208,20 +378,163 @@ async def get_task_transcription(task_id: str):
             detail="No transcription available for this task"
         )
 
+    task, change = await task_manager.patch_transcription(
+        task_id,
+        request.version,
+        request.operations,
+        apply_operations
+    )
+
     return {
         "task_id": task_id,
-        "language": task.transcription.language,
+        "version": task.transcription_version,
         "duration": task.transcription.duration,
-        "segments": [
+        "segment_count": len(task.transcription.segments),
+        "changed": change.intervals,
+    }
+
+
+@router.get(
+    "/tasks/{task_id}/transcription/changes",
+    response_class=ORJSONResponse,
+    summary="Get transcription change log",
+    description="List the edit operations applied after a given transcription version"
+)
+async def get_transcription_changes(task_id: str, since: int = Query(..., ge=0)):
+    task_manager = get_task_manager()
+    task = await task_manager.get_task(task_id)
+
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} not found"
+        )
+
+    changes = task.transcription_changes
+    # Without every later change a client cannot catch up by replaying; it must reload.
+    if since < task.transcription_version and (not changes or changes[0].version > since + 1):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Changes since this version are no longer available; reload the transcription"
+        )
+
+    return {
+        "task_id": task_id,
+        "version": task.transcription_version,
+        "changes": [
             {
-                "start": seg.start,
-                "end": seg.end,
-                "text": seg.text,
-                "words": seg.words
+                "version": change.version,
+                "operations": change.operations,
+                "changed": change.intervals,
+                "created_at": change.created_at,
             }
-            for seg in task.transcription.segments
-        ]
+            for change in changes
+            if change.version > since
+        ],
+    }
+
+
+@router.get(
+    "/tasks/{task_id}/captions.{fmt}",
+    summary="Export captions as a subtitle file",
+    description="Download the task's captions as SRT, WebVTT, ASS or JSON without rendering video"
+)
+async def export_task_captions(
+    task_id: str,
+    fmt: SubtitleFormat,
+    style: Optional[CaptionStyle] = Query(default=None),
+    position: Optional[CaptionPosition] = Query(default=None),
+    font_size: Optional[int] = Query(default=None, ge=12, le=120),
+    highlight_color: Optional[str] = Query(default=None),
+    max_words_per_line: Optional[int] = Query(default=None, ge=1, le=15),
+    if_none_match: Optional[str] = Header(default=None),
+):
+    task_manager = get_task_manager()
+    task = await task_manager.get_task(task_id)
+
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} not found"
+        )
+
+    if not task.transcription:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No transcription available for this task"
+        )
+
+    overrides = {
+        "style": style,
+        "position": position,
+        "font_size": font_size,
+        "highlight_color": highlight_color,
+        "max_words_per_line": max_words_per_line,
     }
+    config = CaptionConfig(**{
+        **(task.caption_config or {}),
+        **{key: value for key, value in overrides.items() if value is not None}
+    })
+
+    exporter = get_caption_exporter()
+    etag = exporter.etag(task, config, fmt)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    export = await exporter.export(task, config, fmt)
+    headers["Content-Disposition"] = f'inline; filename="{export.filename}"'
+    return Response(content=export.body, media_type=export.media_type, headers=headers)
+
+
+@router.post(
+    "/tasks/{task_id}/preview-frame",
+    summary="Preview caption styling on a single frame",
+    description="Render one frame at a timestamp with captions burned in, without encoding video"
+)
+async def preview_caption_frame(
+    task_id: str,
+    request: FramePreviewRequest,
+    if_none_match: Optional[str] = Header(default=None),
+):
+    task_manager = get_task_manager()
+    task = await task_manager.get_task(task_id)
+
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} not found"
+        )
+
+    if not task.transcription:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No transcription available for this task"
+        )
+
+    if not task.input_path or not Path(task.input_path).exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Source video not found"
+        )
+
+    config = request.caption_config or CaptionConfig(**(task.caption_config or {}))
+    previewer = get_frame_previewer()
+    etag = previewer.etag(task, config, request.timestamp, request.format)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        preview = await previewer.render(task, config, request.timestamp, request.format)
+    except VideoProcessingError as e:
+        logger.error("frame_preview_failed", task_id=task_id, error=e.message)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to render preview frame"
+        )
+
+    return Response(content=preview.body, media_type=preview.media_type, headers=headers)
 
 
 @router.post(
@@ -253,24 +566,48 @@ async def reprocess_video(
                 detail="Original task does not have a video file"
             )
 
+        if original_task.clip_length is not None and request.output_mode == CaptionOutputMode.SOFT:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Soft subtitles keep the whole source video; they are not available for clipped tasks"
+            )
+
+        if request.segments is None and not original_task.transcription:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Original task has no stored transcription; send segments"
+            )
+
         # Use provided config or default
         caption_config = request.caption_config or CaptionConfig()
 
         # Create new task for the reprocess
         new_task = await task_manager.create_task(
+            parent_task_id=original_task.id,
             input_path=original_task.input_path,
-            caption_config=caption_config.model_dump()
+            caption_config=caption_config.model_dump(),
+            render_profile=request.render_profile.value,
+            output_mode=request.output_mode.value,
+            clip_start=original_task.clip_start,
+            clip_end=original_task.clip_end,
+            metadata=_transcription_source(request.segments, original_task)
         )
 
         # Prepare segments data for reprocessing
-        segments_data = [seg.model_dump() for seg in request.segments]
+        segments_data = [seg.model_dump() for seg in request.segments] if request.segments is not None else None
 
         # Add rendering to background tasks
         background_tasks.add_task(
             orchestrator.reprocess_with_edited_transcription,
             new_task.id,
             segments_data,
-            caption_config
+            caption_config,
+            request.render_profile,
+            request.start,
+            request.end,
+            request.output_mode,
+            request.output_preset,
+            None if segments_data is not None else original_task.transcription
         )
 
         logger.info("video_reprocess_initiated", original_task_id=request.task_id, new_task_id=new_task.id)
@@ -282,6 +619,10 @@ async def reprocess_video(
             message="Reprocessing started with edited transcription",
             created_at=new_task.created_at,
             updated_at=new_task.updated_at,
+            render_profile=new_task.render_profile,
+            output_mode=new_task.output_mode,
+            clip_start=new_task.clip_start,
+            clip_end=new_task.clip_end,
         )
     except HTTPException:
         raise
@@ -293,6 +634,89 @@ async def reprocess_video(
         )
 
 
+@router.post(
+    "/reprocess/batch",
+    response_model=TaskResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Render several caption variants in one pass",
+    description="Render a list of caption styles and output sizes from a single decode of the original video"
+)
+async def reprocess_video_batch(
+    background_tasks: BackgroundTasks,
+    request: BatchRenderRequest
+):
+    orchestrator = get_caption_orchestrator()
+    task_manager = get_task_manager()
+
+    try:
+        original_task = await task_manager.get_task(request.task_id)
+        if not original_task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task {request.task_id} not found"
+            )
+
+        if not original_task.input_path:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Original task does not have a video file"
+            )
+
+        if request.segments is None and not original_task.transcription:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Original task has no stored transcription; send segments"
+            )
+
+        new_task = await task_manager.create_task(
+            parent_task_id=original_task.id,
+            input_path=original_task.input_path,
+            caption_config=request.variants[0].caption_config.model_dump(),
+            render_profile=request.render_profile.value,
+            clip_start=original_task.clip_start,
+            clip_end=original_task.clip_end,
+            metadata=_transcription_source(request.segments, original_task)
+        )
+
+        segments_data = [seg.model_dump() for seg in request.segments] if request.segments is not None else None
+
+        background_tasks.add_task(
+            orchestrator.render_variants,
+            new_task.id,
+            segments_data,
+            request.variants,
+            request.render_profile,
+            None if segments_data is not None else original_task.transcription
+        )
+
+        logger.info(
+            "video_batch_render_initiated",
+            original_task_id=request.task_id,
+            new_task_id=new_task.id,
+            variants=len(request.variants)
+        )
+
+        return TaskResponse(
+            task_id=new_task.id,
+            status=TaskStatus(new_task.status.value),
+            progress=new_task.progress,
+            message=f"Rendering {len(request.variants)} caption variants",
+            created_at=new_task.created_at,
+            updated_at=new_task.updated_at,
+            render_profile=new_task.render_profile,
+            clip_start=new_task.clip_start,
+            clip_end=new_task.clip_end,
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("batch_render_request_failed", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch rendering failed: {str(e)}"
+        )
+
+
 @router.get(
     "/stream/{task_id}",
     summary="Stream source video",
@@ -363,9 +787,13 @@ async def get_video_thumbnail(task_id: str):
         # Generate thumbnail
         video_processor = get_video_processor()
         try:
-            # Generate thumbnail at 10% of duration or 1 second, whichever is safe
-            # For now, just use 1.0s or 0.0s
-            await video_processor.generate_thumbnail(video_path, thumbnail_path, time=1.0)
+            media_info = await get_media_probe_cache().probe(video_path)
+            duration = task.clip_length or media_info.duration
+            await video_processor.generate_thumbnail(
+                video_path,
+                thumbnail_path,
+                time=task.clip_offset + video_processor.default_thumbnail_time(duration)
+            )
         except Exception as e:
             logger.error(f"Failed to generate thumbnail for task {task_id}: {e}")
             raise HTTPException(
@@ -17,8 +17,32 @@ class Settings(BaseSettings):
     temp_dir: str = Field(default="temp")
     max_file_size_mb: int = 500
     allowed_extensions: list[str] = ["mp4", "mov", "avi", "mkv", "webm"]
+    media_probe_cache_size: int = 256
+    ingest_storyboard_enabled: bool = False
+    storyboard_columns: int = 5
+    storyboard_rows: int = 5
+    storyboard_tile_width: int = 160
+    ingest_proxy_height: int = 0
     
     whisper_model: str = "base"
+    transcription_profile: str = "balanced"
+    
+    transcription_batching_enabled: bool = False
+    transcription_batch_size: int = 8
+    transcription_batch_max_wait_ms: int = 200
+    transcription_batch_max_clip_seconds: float = 30.0
+    
+    transcription_cpu_optimization: bool = False
+    transcription_cpu_cores: Optional[int] = None
+    transcription_max_concurrency: int = 2
+    
+    vad_enabled: bool = False
+    vad_frame_ms: int = 30
+    vad_threshold_db: float = 12.0
+    vad_min_speech_ms: int = 250
+    vad_min_silence_ms: int = 600
+    vad_padding_ms: int = 200
+    vad_gap_seconds: float = 0.3
     
     redis_url: str = "redis://localhost:6379/0"
     celery_broker_url: str = "redis://localhost:6379/0"
@@ -29,6 +53,34 @@ class Settings(BaseSettings):
     aws_access_key_id: Optional[str] = None
     aws_secret_access_key: Optional[str] = None
     
+    subtitle_engine: str = "karaoke"
+    
+    render_preset: str = "medium"
+    render_crf: int = 23
+    render_threads: int = 0
+    preview_preset: str = "ultrafast"
+    preview_crf: int = 30
+    preview_max_height: int = 480
+    preview_max_fps: int = 15
+    render_progress_interval: float = 1.0
+    ffmpeg_stderr_lines: int = 200
+    incremental_render_enabled: bool = True
+    incremental_render_max_changed_ratio: float = 0.5
+    render_parallel_chunks: int = 1
+    render_chunk_min_seconds: float = 60.0
+    frame_preview_cache_size: int = 128
+    caption_export_cache_entries: int = 256
+    render_cache_enabled: bool = True
+    render_cache_dir: str = Field(default="cache/renders")
+    render_cache_max_mb: int = 2048
+    speculative_render_enabled: bool = False
+    speculative_render_niceness: int = 19
+    transcription_change_log_size: int = 200
+    transcription_response_cache_size: int = 64
+    response_compression_min_bytes: int = 1024
+    search_max_prefix_terms: int = 500
+    metrics_enabled: bool = True
+    
     log_level: str = "INFO"
     
     class Config:
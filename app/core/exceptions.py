@@ -20,6 +20,14 @@ class TranscriptionError(VideoCaptionException):
     pass
 
 
+class TranscriptionEditError(VideoCaptionException):
+    pass
+
+
+class TranscriptionConflictError(VideoCaptionException):
+    pass
+
+
 class InvalidFileTypeError(VideoCaptionException):
     pass
 
@@ -0,0 +1,103 @@
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Labels only ever take values from small fixed sets (stage names, task
+# statuses, route templates, cache names) so the series count stays bounded.
+
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+REAL_TIME_FACTOR_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 3, 5)
+
+STAGE_DURATION = Histogram(
+    "video_captions_stage_duration_seconds",
+    "Wall time of one pipeline stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_FAILURES = Counter(
+    "video_captions_stage_failures_total",
+    "Pipeline stages that raised",
+    ["stage"],
+)
+STAGES_IN_PROGRESS = Gauge(
+    "video_captions_stages_in_progress",
+    "Pipeline stages currently running",
+    ["stage"],
+)
+
+TRANSCRIPTION_REAL_TIME_FACTOR = Histogram(
+    "video_captions_transcription_real_time_factor",
+    "Transcription processing seconds per second of audio",
+    ["profile"],
+    buckets=REAL_TIME_FACTOR_BUCKETS,
+)
+TRANSCRIPTION_AUDIO_SECONDS = Counter(
+    "video_captions_transcription_audio_seconds_total",
+    "Seconds of audio transcribed",
+    ["profile"],
+)
+
+RENDER_DURATION = Histogram(
+    "video_captions_render_duration_seconds",
+    "Caption render time on a render cache miss, by render mode",
+    ["mode"],
+    buckets=STAGE_BUCKETS,
+)
+
+TASKS = Gauge(
+    "video_captions_tasks",
+    "Tasks held by the task manager, by status",
+    ["status"],
+)
+
+CACHE_LOOKUPS = Counter(
+    "video_captions_cache_lookups_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+
+REQUEST_DURATION = Histogram(
+    "video_captions_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=REQUEST_BUCKETS,
+)
+
+
+@contextmanager
+def observe_stage(stage: str):
+    """Time the enclosed block as ``stage`` and count it while it runs.
+
+    Cancellation is timed but not counted as a failure.
+    """
+    in_progress = STAGES_IN_PROGRESS.labels(stage=stage)
+    in_progress.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_FAILURES.labels(stage=stage).inc()
+        raise
+    finally:
+        STAGE_DURATION.labels(stage=stage).observe(time.perf_counter() - started)
+        in_progress.dec()
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def observe_request(method: str, route: Optional[str], status_code: Optional[int], seconds: float):
+    """Record one request; unmatched paths share a label so scans cannot add series."""
+    status = f"{status_code // 100}xx" if status_code else "none"
+    REQUEST_DURATION.labels(method=method, route=route or "unmatched", status=status).observe(seconds)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    # Passed as a header: media_type would get a second charset appended.
+    return Response(generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -7,6 +7,7 @@ from app.api.v1.router import api_router
 from app.core.config import get_settings
 from app.core.logging import setup_logging, get_logger
 from app.core.exceptions import VideoCaptionException
+from app.core.metrics import metrics_endpoint
 from app.middleware.logging import RequestLoggingMiddleware
 from app.middleware.error_handler import (
     video_caption_exception_handler,
@@ -52,6 +53,9 @@ def create_application() -> FastAPI:
     app.add_exception_handler(Exception, generic_exception_handler)
     
     app.include_router(api_router, prefix=settings.api_prefix)
+
+    if settings.metrics_enabled:
+        app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
     
     return app
 
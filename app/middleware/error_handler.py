@@ -1,12 +1,15 @@
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
 
 from app.core.exceptions import (
     VideoCaptionException,
     VideoNotFoundError,
     VideoProcessingError,
     TranscriptionError,
+    TranscriptionEditError,
+    TranscriptionConflictError,
     InvalidFileTypeError,
     FileTooLargeError,
     StorageError,
@@ -26,7 +29,9 @@ async def video_caption_exception_handler(request: Request, exc: VideoCaptionExc
         status_code = status.HTTP_404_NOT_FOUND
     elif isinstance(exc, (InvalidFileTypeError, FileTooLargeError)):
         status_code = status.HTTP_400_BAD_REQUEST
-    elif isinstance(exc, (VideoProcessingError, TranscriptionError)):
+    elif isinstance(exc, TranscriptionConflictError):
+        status_code = status.HTTP_409_CONFLICT
+    elif isinstance(exc, (VideoProcessingError, TranscriptionError, TranscriptionEditError)):
         status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
     elif isinstance(exc, StorageError):
         status_code = status.HTTP_503_SERVICE_UNAVAILABLE
@@ -49,7 +54,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={
             "error": "ValidationError",
             "message": "Request validation failed",
-            "details": exc.errors(),
+            # Errors from custom validators carry the raised exception in ``ctx``.
+            "details": jsonable_encoder(exc.errors()),
         }
     )
 
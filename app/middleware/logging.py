@@ -1,39 +1,88 @@
 import time
 import uuid
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 
 from app.core.logging import get_logger
+from app.core.metrics import observe_request
 
 logger = get_logger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next) -> Response:
+class RequestLoggingMiddleware:
+    """Request ID, timing and size logging as plain ASGI.
+
+    Messages are passed straight through, so streamed and file responses are
+    not buffered or re-chunked. ``X-Response-Time`` is the time until the
+    response headers were sent; the log line covers the whole body but not
+    background tasks that run after it. The same duration is recorded in the
+    request latency histogram under the matched route template.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         request_id = str(uuid.uuid4())[:8]
-        start_time = time.time()
-        
+        start_time = time.perf_counter()
+
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(
             request_id=request_id,
-            method=request.method,
-            path=request.url.path,
+            method=scope["method"],
+            path=scope["path"],
         )
-        
+
         logger.info("request_started")
-        
-        response = await call_next(request)
-        
-        duration_ms = (time.time() - start_time) * 1000
-        
-        logger.info(
-            "request_completed",
-            status_code=response.status_code,
-            duration_ms=round(duration_ms, 2)
-        )
-        
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Response-Time"] = f"{duration_ms:.2f}ms"
-        
-        return response
+
+        status_code = None
+        bytes_sent = 0
+        completed = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, bytes_sent, completed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Request-ID", request_id)
+                headers.append("X-Response-Time", f"{(time.perf_counter() - start_time) * 1000:.2f}ms")
+            elif message["type"] == "http.response.body":
+                bytes_sent += len(message.get("body", b""))
+            await send(message)
+
+            # Log at the last body chunk; background tasks run after it in the same call.
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                completed = True
+                duration = time.perf_counter() - start_time
+                observe_request(scope["method"], _route_template(scope), status_code, duration)
+                logger.info(
+                    "request_completed",
+                    status_code=status_code,
+                    duration_ms=round(duration * 1000, 2),
+                    bytes_sent=bytes_sent
+                )
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not completed:
+                duration = time.perf_counter() - start_time
+                observe_request(scope["method"], _route_template(scope), status_code or 500, duration)
+                logger.error(
+                    "request_failed",
+                    status_code=status_code,
+                    duration_ms=round(duration * 1000, 2),
+                    bytes_sent=bytes_sent
+                )
+            raise
+
+
+def _route_template(scope: Scope):
+    # The router writes the matched route into the same scope dict.
+    route = scope.get("route")
+    return getattr(route, "path", None)
@@ -27,6 +27,15 @@ class Transcription:
     segments: List[TranscriptionSegment]
     language: str
     duration: float
+    metrics: dict = field(default_factory=dict)
+
+
+@dataclass
+class TranscriptionChange:
+    version: int
+    operations: List[dict]
+    intervals: List[List[float]]
+    created_at: datetime = field(default_factory=datetime.utcnow)
 
 
 @dataclass
@@ -35,6 +44,7 @@ class VideoTask:
     status: TaskStatusEnum = TaskStatusEnum.PENDING
     progress: float = 0.0
     message: Optional[str] = None
+    parent_task_id: Optional[str] = None
     input_path: Optional[str] = None
     output_path: Optional[str] = None
     result_url: Optional[str] = None
@@ -42,4 +52,22 @@ class VideoTask:
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
     caption_config: Optional[dict] = None
+    transcription_profile: Optional[str] = None
+    render_profile: Optional[str] = None
+    output_mode: Optional[str] = None
+    clip_start: Optional[float] = None
+    clip_end: Optional[float] = None
+    language: Optional[str] = None
     transcription: Optional[Transcription] = None
+    transcription_version: int = 0
+    transcription_changes: List[TranscriptionChange] = field(default_factory=list)
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def clip_offset(self) -> float:
+        """Source time of the task's ``t = 0``; transcriptions are relative to it."""
+        return self.clip_start or 0.0
+
+    @property
+    def clip_length(self) -> Optional[float]:
+        return self.clip_end - self.clip_offset if self.clip_end is not None else None
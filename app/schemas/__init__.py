@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Literal, Optional, Union
 from enum import Enum
 from datetime import datetime
 
@@ -25,6 +25,36 @@ class FontWeight(str, Enum):
     BLACK = "black"
 
 
+class TranscriptionProfile(str, Enum):
+    DRAFT = "draft"
+    BALANCED = "balanced"
+    ACCURATE = "accurate"
+
+
+class RenderProfile(str, Enum):
+    PREVIEW = "preview"
+    FINAL = "final"
+
+
+class CaptionOutputMode(str, Enum):
+    BURN_IN = "burn_in"
+    SOFT = "soft"
+
+
+class OutputPreset(str, Enum):
+    TIKTOK = "tiktok"
+    REELS = "reels"
+    SHORTS = "shorts"
+    SQUARE = "square"
+
+
+class SubtitleFormat(str, Enum):
+    SRT = "srt"
+    VTT = "vtt"
+    ASS = "ass"
+    JSON = "json"
+
+
 class CaptionConfig(BaseModel):
     style: CaptionStyle = Field(default=CaptionStyle.TIKTOK)
     position: CaptionPosition = Field(default=CaptionPosition.BOTTOM)
@@ -63,6 +93,12 @@ class TaskResponse(BaseModel):
     updated_at: datetime
     result_url: Optional[str] = None
     error: Optional[str] = None
+    transcription_profile: Optional[str] = None
+    render_profile: Optional[str] = None
+    output_mode: Optional[str] = None
+    clip_start: Optional[float] = None
+    clip_end: Optional[float] = None
+    metadata: Optional[dict] = None
 
 
 class TranscriptionSegmentSchema(BaseModel):
@@ -74,8 +110,158 @@ class TranscriptionSegmentSchema(BaseModel):
 
 class EditTranscriptionRequest(BaseModel):
     task_id: str = Field(..., description="Original task ID to retrieve transcription from")
-    segments: list[TranscriptionSegmentSchema] = Field(..., description="Edited transcription segments")
+    segments: Optional[list[TranscriptionSegmentSchema]] = Field(
+        default=None,
+        description="Edited transcription segments; omit to render the task's stored (PATCHed) transcription"
+    )
     caption_config: Optional[CaptionConfig] = Field(default_factory=CaptionConfig)
+    render_profile: RenderProfile = Field(default=RenderProfile.FINAL)
+    output_mode: CaptionOutputMode = Field(
+        default=CaptionOutputMode.BURN_IN,
+        description="burn_in re-encodes captions into the picture; soft muxes a subtitle track without re-encoding"
+    )
+    output_preset: Optional[OutputPreset] = Field(
+        default=None,
+        description="Scale, crop and frame-rate target for a platform; captions are laid out at that size"
+    )
+    start: Optional[float] = Field(
+        default=None, ge=0, description="Render only from this time (seconds, relative to the task's clip)"
+    )
+    end: Optional[float] = Field(
+        default=None, gt=0, description="Render only up to this time (seconds, relative to the task's clip)"
+    )
+
+    @model_validator(mode="after")
+    def check_window(self):
+        if self.start is not None and self.end is not None and self.end <= self.start:
+            raise ValueError("end must be greater than start")
+        if self.output_mode == CaptionOutputMode.SOFT and (self.start is not None or self.end is not None):
+            raise ValueError("soft subtitles are muxed over the whole video; start/end are not supported")
+        if self.output_mode == CaptionOutputMode.SOFT and self.output_preset is not None:
+            raise ValueError("soft subtitles keep the source video; output_preset is not supported")
+        return self
+
+
+class RenderVariant(BaseModel):
+    name: Optional[str] = Field(default=None, pattern=r"^[A-Za-z0-9_-]{1,32}$")
+    caption_config: CaptionConfig = Field(default_factory=CaptionConfig)
+    width: Optional[int] = Field(default=None, ge=16, le=4096, description="Output width in pixels")
+    height: Optional[int] = Field(default=None, ge=16, le=4096, description="Output height in pixels")
+    crop: bool = Field(
+        default=False,
+        description="Fill width x height exactly by center-cropping; otherwise fit inside it keeping the aspect ratio"
+    )
+    preset: Optional[OutputPreset] = Field(default=None, description="Platform preset; replaces width/height/crop")
+
+    @model_validator(mode="after")
+    def check_size(self):
+        if self.crop and (self.width is None or self.height is None):
+            raise ValueError("crop requires both width and height")
+        if self.preset and (self.width is not None or self.height is not None):
+            raise ValueError("preset cannot be combined with width/height")
+        return self
+
+
+class BatchRenderRequest(BaseModel):
+    task_id: str = Field(..., description="Original task ID to retrieve the video from")
+    segments: Optional[list[TranscriptionSegmentSchema]] = Field(
+        default=None,
+        description="Edited transcription segments; omit to render the task's stored transcription"
+    )
+    variants: list[RenderVariant] = Field(..., min_length=1, max_length=8)
+    render_profile: RenderProfile = Field(default=RenderProfile.FINAL)
+
+    @model_validator(mode="after")
+    def check_names(self):
+        names = [variant.name for variant in self.variants if variant.name]
+        if len(names) != len(set(names)):
+            raise ValueError("variant names must be unique")
+        return self
+
+
+class TranscriptionLayout(str, Enum):
+    ROWS = "rows"
+    COLUMNS = "columns"
+
+
+class WordSchema(BaseModel):
+    word: str
+    start: float = Field(..., ge=0)
+    end: float = Field(..., ge=0)
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.end < self.start:
+            raise ValueError("end must not be before start")
+        return self
+
+
+class ReplaceTextOperation(BaseModel):
+    op: Literal["replace_text"]
+    index: int = Field(..., ge=0, description="Segment index")
+    text: str = Field(..., min_length=1)
+    words: Optional[list[WordSchema]] = Field(
+        default=None,
+        description="New word timings; derived from the old ones when omitted"
+    )
+
+
+class ShiftOperation(BaseModel):
+    op: Literal["shift"]
+    index: int = Field(..., ge=0, description="First segment to move")
+    count: int = Field(default=1, ge=1, description="Number of consecutive segments to move")
+    delta: float = Field(..., description="Seconds to add to segment and word timings")
+
+
+class RetimeOperation(BaseModel):
+    op: Literal["retime"]
+    index: int = Field(..., ge=0)
+    start: float = Field(..., ge=0)
+    end: float = Field(..., gt=0)
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.end <= self.start:
+            raise ValueError("end must be greater than start")
+        return self
+
+
+class SplitOperation(BaseModel):
+    op: Literal["split"]
+    index: int = Field(..., ge=0)
+    at: float = Field(..., ge=0, description="Split time; words starting at or after it move to the new segment")
+
+
+class MergeOperation(BaseModel):
+    op: Literal["merge"]
+    index: int = Field(..., ge=0, description="Segment merged with the one after it")
+
+
+class OffsetOperation(BaseModel):
+    op: Literal["offset"]
+    delta: float = Field(..., description="Seconds to add to every timing")
+
+
+TranscriptionOperation = Annotated[
+    Union[ReplaceTextOperation, ShiftOperation, RetimeOperation, SplitOperation, MergeOperation, OffsetOperation],
+    Field(discriminator="op")
+]
+
+
+class TranscriptionPatchRequest(BaseModel):
+    version: int = Field(..., ge=0, description="Transcription version the operations were made against")
+    operations: list[TranscriptionOperation] = Field(..., min_length=1, max_length=500)
+
+
+class FrameFormat(str, Enum):
+    JPEG = "jpeg"
+    PNG = "png"
+
+
+class FramePreviewRequest(BaseModel):
+    timestamp: float = Field(..., ge=0, description="Time of the frame to render (seconds)")
+    caption_config: Optional[CaptionConfig] = Field(default=None, description="Defaults to the task's caption config")
+    format: FrameFormat = Field(default=FrameFormat.JPEG)
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from app.models import VideoTask
+from app.schemas import CaptionConfig, SubtitleFormat
+from app.services.media_probe import get_media_probe_cache
+from app.services.subtitles import AssSubtitleWriter, build_caption_lines, render_json, render_srt, render_webvtt
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# PlayRes used for ASS exports when the source video is gone; libass scales it.
+FALLBACK_PLAY_RES = (1920, 1080)
+
+
+@dataclass
+class CaptionExport:
+    body: bytes
+    etag: str
+    media_type: str
+    filename: str
+
+
+class CaptionExporter:
+    """Serializes stored transcriptions to subtitle files.
+
+    Results are cached per (task, transcription version, format, config), and
+    the ETag is derived from that key, so conditional requests are answered
+    without building the file.
+    """
+
+    MEDIA_TYPES = {
+        SubtitleFormat.SRT: "application/x-subrip; charset=utf-8",
+        SubtitleFormat.VTT: "text/vtt",
+        SubtitleFormat.ASS: "text/x-ssa",
+        SubtitleFormat.JSON: "application/json",
+    }
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or get_settings().caption_export_cache_entries
+        self._cache: "OrderedDict[str, CaptionExport]" = OrderedDict()
+
+    @staticmethod
+    def etag(task: VideoTask, config: CaptionConfig, fmt: SubtitleFormat) -> str:
+        key = json.dumps(
+            [task.id, task.transcription_version, fmt.value, config.model_dump(mode="json")],
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+    async def export(self, task: VideoTask, config: CaptionConfig, fmt: SubtitleFormat) -> CaptionExport:
+        etag = self.etag(task, config, fmt)
+        cached = self._cache.get(etag)
+        if cached is not None:
+            self._cache.move_to_end(etag)
+            return cached
+
+        play_res = await self._play_res(task) if fmt == SubtitleFormat.ASS else None
+        transcription = task.transcription
+
+        def _render() -> str:
+            lines = build_caption_lines(transcription, config)
+            if fmt == SubtitleFormat.SRT:
+                return render_srt(lines)
+            if fmt == SubtitleFormat.VTT:
+                return render_webvtt(lines)
+            if fmt == SubtitleFormat.ASS:
+                return AssSubtitleWriter(config, *play_res).render(lines)
+            return render_json(lines)
+
+        body = (await asyncio.to_thread(_render)).encode("utf-8")
+        export = CaptionExport(
+            body=body,
+            etag=etag,
+            media_type=self.MEDIA_TYPES[fmt],
+            filename=f"captions_{task.id[:8]}.{fmt.value}",
+        )
+        self._cache[etag] = export
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+        logger.info("captions_exported", task_id=task.id, format=fmt.value, bytes=len(body))
+        return export
+
+    @staticmethod
+    async def _play_res(task: VideoTask) -> Tuple[int, int]:
+        if task.input_path and Path(task.input_path).exists():
+            info = await get_media_probe_cache().probe(Path(task.input_path))
+            return info.width, info.height
+        return FALLBACK_PLAY_RES
+
+
+_caption_exporter: Optional[CaptionExporter] = None
+
+
+def get_caption_exporter() -> CaptionExporter:
+    global _caption_exporter
+    if _caption_exporter is None:
+        _caption_exporter = CaptionExporter()
+    return _caption_exporter
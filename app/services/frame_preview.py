@@ -0,0 +1,93 @@
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.models import VideoTask
+from app.schemas import CaptionConfig, FrameFormat
+from app.services.storage import get_storage_service
+from app.services.video_processor import get_video_processor
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import record_cache_lookup
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class FramePreview:
+    body: bytes
+    etag: str
+    media_type: str
+
+
+class FramePreviewer:
+    """Single styled frames for the caption editor, kept in an in-memory LRU.
+
+    Keyed by task, transcription version, timestamp (to the millisecond),
+    caption config and image format. A task's source file never changes, so
+    the task id stands in for its content and cache hits never read it.
+    """
+
+    MEDIA_TYPES = {
+        FrameFormat.JPEG: "image/jpeg",
+        FrameFormat.PNG: "image/png",
+    }
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or get_settings().frame_preview_cache_size
+        self._cache: "OrderedDict[str, FramePreview]" = OrderedDict()
+
+    @staticmethod
+    def etag(task: VideoTask, config: CaptionConfig, timestamp: float, fmt: FrameFormat) -> str:
+        key = json.dumps(
+            [task.id, task.transcription_version, round(timestamp, 3), fmt.value, config.model_dump(mode="json")],
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+    async def render(self, task: VideoTask, config: CaptionConfig, timestamp: float, fmt: FrameFormat) -> FramePreview:
+        etag = self.etag(task, config, timestamp, fmt)
+        cached = self._cache.get(etag)
+        record_cache_lookup("frame_preview", hit=cached is not None)
+        if cached is not None:
+            self._cache.move_to_end(etag)
+            return cached
+
+        storage = get_storage_service()
+        extension = "jpg" if fmt == FrameFormat.JPEG else "png"
+        output_path = storage.get_temp_path(f"frame.{extension}")
+        try:
+            await get_video_processor().render_frame(
+                Path(task.input_path),
+                output_path,
+                task.transcription,
+                config,
+                timestamp,
+                source_offset=task.clip_offset,
+                duration=task.clip_length
+            )
+            body = output_path.read_bytes()
+        finally:
+            await storage.delete_file(output_path)
+
+        preview = FramePreview(body=body, etag=etag, media_type=self.MEDIA_TYPES[fmt])
+        self._cache[etag] = preview
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+        logger.info("frame_preview_rendered", task_id=task.id, timestamp=timestamp, bytes=len(body))
+        return preview
+
+
+_frame_previewer: Optional[FramePreviewer] = None
+
+
+def get_frame_previewer() -> FramePreviewer:
+    global _frame_previewer
+    if _frame_previewer is None:
+        _frame_previewer = FramePreviewer()
+    return _frame_previewer
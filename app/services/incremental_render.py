@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import List, Sequence, Tuple
+
+from app.services.subtitles import CaptionLine
+
+# Keyframe timestamps from ffprobe are rounded to microseconds.
+EPSILON = 1e-3
+
+
+@dataclass
+class RenderRange:
+    start: float
+    end: float
+    reencode: bool
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def _line_key(line: CaptionLine) -> Tuple:
+    return (
+        round(line.start, 2),
+        round(line.end, 2),
+        tuple((w.text, round(w.start, 3), round(w.end, 3)) for w in line.words),
+    )
+
+
+def changed_intervals(old_lines: Sequence[CaptionLine], new_lines: Sequence[CaptionLine]) -> List[Tuple[float, float]]:
+    """Time spans whose rendered captions differ between two line layouts."""
+    matcher = SequenceMatcher(
+        a=[_line_key(line) for line in old_lines],
+        b=[_line_key(line) for line in new_lines],
+        autojunk=False
+    )
+    intervals = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        for line in list(old_lines[i1:i2]) + list(new_lines[j1:j2]):
+            intervals.append((line.start, line.end))
+
+    intervals.sort()
+    merged: List[Tuple[float, float]] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def plan_ranges(
+    keyframes: Sequence[float],
+    duration: float,
+    intervals: Sequence[Tuple[float, float]]
+) -> List[RenderRange]:
+    """Expand changed intervals to whole GOPs of the previous render.
+
+    Returns contiguous ranges covering ``[0, duration)`` that are either
+    re-encoded from the source or stream-copied from the previous output.
+    """
+    bounds = sorted({0.0, *[k for k in keyframes if EPSILON < k < duration - EPSILON]})
+    bounds.append(duration)
+
+    ranges: List[RenderRange] = []
+    for gop_start, gop_end in zip(bounds, bounds[1:]):
+        dirty = any(start < gop_end - EPSILON and end > gop_start + EPSILON for start, end in intervals)
+        if ranges and ranges[-1].reencode == dirty:
+            ranges[-1].end = gop_end
+        else:
+            ranges.append(RenderRange(start=gop_start, end=gop_end, reencode=dirty))
+    return ranges
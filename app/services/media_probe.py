@@ -0,0 +1,216 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from fractions import Fraction
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import ffmpeg
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import record_cache_lookup
+from app.core.exceptions import VideoProcessingError
+
+logger = get_logger(__name__)
+
+DEFAULT_FRAME_RATE = Fraction(30, 1)
+
+
+def parse_frame_rate(value: Optional[str]) -> Optional[Fraction]:
+    """Parse ffprobe rates such as ``30000/1001``; ``0/0`` means unknown."""
+    if not value:
+        return None
+    try:
+        rate = Fraction(value)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate if rate > 0 else None
+
+
+def _rotation(stream: dict) -> int:
+    for side_data in stream.get("side_data_list", []):
+        if "rotation" in side_data:
+            return int(round(float(side_data["rotation"]))) % 360
+    rotate = stream.get("tags", {}).get("rotate")
+    return int(rotate) % 360 if rotate else 0
+
+
+@dataclass
+class MediaInfo:
+    width: int
+    height: int
+    coded_width: int
+    coded_height: int
+    duration: float
+    frame_rate: Fraction
+    rotation: int
+    has_audio: bool
+    video_codec: Optional[str]
+    audio_codec: Optional[str]
+    streams: List[dict] = field(default_factory=list)
+    keyframes: Optional[List[float]] = None
+
+    @property
+    def fps(self) -> float:
+        return float(self.frame_rate)
+
+    @classmethod
+    def from_probe(cls, probe: dict) -> "MediaInfo":
+        streams = probe.get("streams", [])
+        video = next((s for s in streams if s.get("codec_type") == "video"), None)
+        if not video:
+            raise VideoProcessingError("No video stream found")
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+        coded_width, coded_height = int(video["width"]), int(video["height"])
+        rotation = _rotation(video)
+        # ffmpeg autorotates on decode, so filters see the display orientation.
+        width, height = (coded_height, coded_width) if rotation in (90, 270) else (coded_width, coded_height)
+
+        duration = probe.get("format", {}).get("duration") or video.get("duration") or 0
+        frame_rate = (
+            parse_frame_rate(video.get("r_frame_rate"))
+            or parse_frame_rate(video.get("avg_frame_rate"))
+            or DEFAULT_FRAME_RATE
+        )
+        return cls(
+            width=width,
+            height=height,
+            coded_width=coded_width,
+            coded_height=coded_height,
+            duration=float(duration),
+            frame_rate=frame_rate,
+            rotation=rotation,
+            has_audio=audio is not None,
+            video_codec=video.get("codec_name"),
+            audio_codec=audio.get("codec_name") if audio else None,
+            streams=streams,
+        )
+
+    def as_video_info(self) -> dict:
+        return {
+            "width": self.width,
+            "height": self.height,
+            "duration": self.duration,
+            "fps": self.fps,
+            "frame_rate": self.frame_rate,
+            "rotation": self.rotation,
+            "has_audio": self.has_audio,
+        }
+
+    def summary(self) -> dict:
+        return {
+            "width": self.width,
+            "height": self.height,
+            "duration": round(self.duration, 3),
+            "frame_rate": f"{self.frame_rate.numerator}/{self.frame_rate.denominator}",
+            "rotation": self.rotation,
+            "has_audio": self.has_audio,
+            "video_codec": self.video_codec,
+            "audio_codec": self.audio_codec,
+        }
+
+
+class MediaProbeCache:
+    """ffprobe results keyed by file identity (path, size, mtime).
+
+    Probes run in a worker thread; concurrent requests for the same file share
+    one ffprobe run. A changed file gets a new identity and is probed again.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or get_settings().media_probe_cache_size
+        self._entries: "OrderedDict[Tuple[str, int, int], MediaInfo]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int, int], asyncio.Future] = {}
+
+    @staticmethod
+    def _identity(path: Path) -> Tuple[str, int, int]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            raise VideoProcessingError(f"Video file not found: {path}")
+        return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+    async def probe(self, path: Path) -> MediaInfo:
+        key = self._identity(path)
+        info = self._entries.get(key)
+        if info is not None:
+            self._entries.move_to_end(key)
+            record_cache_lookup("media_probe", hit=True)
+            return info
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            record_cache_lookup("media_probe", hit=True)
+            return await asyncio.shield(pending)
+
+        record_cache_lookup("media_probe", hit=False)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            probe = await asyncio.to_thread(ffmpeg.probe, str(path))
+            info = MediaInfo.from_probe(probe)
+        except ffmpeg.Error as e:
+            error = VideoProcessingError(
+                f"Failed to probe video: {e.stderr.decode() if e.stderr else str(e)}"
+            )
+            self._fail(key, future, error)
+            raise error
+        except Exception as e:
+            self._fail(key, future, e)
+            raise
+        else:
+            self._store(key, info)
+            future.set_result(info)
+        finally:
+            self._inflight.pop(key, None)
+
+        logger.info("media_probed", path=str(path), **info.summary())
+        return info
+
+    def _fail(self, key, future: asyncio.Future, error: Exception):
+        future.set_exception(error)
+        # Mark retrieved so a probe nobody else awaited does not log a warning.
+        future.exception()
+
+    def _store(self, key, info: MediaInfo):
+        self._entries[key] = info
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def keyframes(self, path: Path) -> List[float]:
+        info = await self.probe(path)
+        if info.keyframes is not None:
+            return info.keyframes
+
+        def _probe_keyframes():
+            probe = ffmpeg.probe(
+                str(path),
+                select_streams="v:0",
+                show_entries="packet=pts_time,flags"
+            )
+            return sorted(
+                float(packet["pts_time"])
+                for packet in probe.get("packets", [])
+                if "K" in packet.get("flags", "") and packet.get("pts_time") not in (None, "N/A")
+            )
+
+        try:
+            info.keyframes = await asyncio.to_thread(_probe_keyframes)
+        except ffmpeg.Error as e:
+            logger.error("keyframe_probe_failed", error=e.stderr.decode() if e.stderr else str(e))
+            raise VideoProcessingError(f"Failed to probe keyframes: {str(e)}")
+        return info.keyframes
+
+
+_media_probe_cache: Optional[MediaProbeCache] = None
+
+
+def get_media_probe_cache() -> MediaProbeCache:
+    global _media_probe_cache
+    if _media_probe_cache is None:
+        _media_probe_cache = MediaProbeCache()
+    return _media_probe_cache
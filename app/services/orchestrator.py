@@ -1,14 +1,22 @@
 import asyncio
+import time
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Deque, List, Optional
 
-from app.models import TaskStatusEnum, Transcription, TranscriptionSegment
-from app.schemas import CaptionConfig
+from app.models import TaskStatusEnum, Transcription, TranscriptionSegment, VideoTask
+from app.schemas import CaptionConfig, CaptionOutputMode, OutputPreset, RenderProfile, RenderVariant, TranscriptionProfile
 from app.services.transcription import get_transcription_service
-from app.services.video_processor import get_video_processor
+from app.services.video_processor import ffmpeg_priority, get_video_processor
 from app.services.storage import get_storage_service
 from app.services.task_manager import get_task_manager
+from app.services.vad import get_voice_activity_detector
+from app.services.render_cache import get_render_cache
+from app.services.media_probe import get_media_probe_cache
+from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import RENDER_DURATION, observe_stage
 from app.core.exceptions import VideoProcessingError
 
 logger = get_logger(__name__)
@@ -20,12 +28,45 @@ class CaptionOrchestrator:
         self.video_processor = get_video_processor()
         self.storage_service = get_storage_service()
         self.task_manager = get_task_manager()
+        self._foreground_jobs = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._speculative_queue: Deque[str] = deque()
+        self._speculative_worker: Optional[asyncio.Task] = None
+        self._speculative_job: Optional[asyncio.Task] = None
+
+    @contextmanager
+    def _foreground(self):
+        """Mark user-requested work; a running speculative render yields to it."""
+        self._foreground_jobs += 1
+        self._idle.clear()
+        if self._speculative_job and not self._speculative_job.done():
+            self._speculative_job.cancel()
+        try:
+            yield
+        finally:
+            self._foreground_jobs -= 1
+            if self._foreground_jobs == 0:
+                self._idle.set()
     
     async def process_video(
         self,
         task_id: str,
         video_path: Path,
-        config: CaptionConfig
+        config: CaptionConfig,
+        transcription_profile: Optional[TranscriptionProfile] = None,
+        language: Optional[str] = None
+    ) -> str:
+        with self._foreground():
+            return await self._process_video(task_id, video_path, config, transcription_profile, language)
+
+    async def _process_video(
+        self,
+        task_id: str,
+        video_path: Path,
+        config: CaptionConfig,
+        transcription_profile: Optional[TranscriptionProfile],
+        language: Optional[str]
     ) -> str:
         try:
             await self.task_manager.update_task(
@@ -35,8 +76,56 @@ class CaptionOrchestrator:
                 message="Starting video processing"
             )
             
-            audio_path = self.storage_service.get_temp_path(f"{task_id}.wav")
-            await self.video_processor.extract_audio(video_path, audio_path)
+            settings = get_settings()
+            task = await self.task_manager.get_task(task_id)
+            media_info = await get_media_probe_cache().probe(video_path)
+            audio_path = self.storage_service.get_temp_path(f"{task_id}.wav") if media_info.has_audio else None
+            artifacts = await self.video_processor.ingest(
+                video_path,
+                audio_path,
+                video_path.parent / f"{video_path.stem}_thumb.jpg",
+                storyboard_path=(
+                    video_path.parent / f"{video_path.stem}_storyboard.jpg"
+                    if settings.ingest_storyboard_enabled else None
+                ),
+                proxy_path=(
+                    video_path.parent / f"{video_path.stem}_proxy.mp4"
+                    if settings.ingest_proxy_height else None
+                ),
+                clip_start=task.clip_start,
+                clip_end=task.clip_end
+            )
+            await self.task_manager.update_task(
+                task_id,
+                metadata={"ingest": {name: path.name for name, path in artifacts.items() if name != "audio"}}
+            )
+
+            if audio_path is None:
+                # Nothing to transcribe; the task is immediately ready for editing.
+                await self.task_manager.update_task(
+                    task_id,
+                    status=TaskStatusEnum.COMPLETED,
+                    progress=100.0,
+                    message="Video has no audio track, ready for editing",
+                    transcription=Transcription(
+                        segments=[],
+                        language=language or "en",
+                        duration=task.clip_length or media_info.duration
+                    ),
+                    metadata={"transcription": {"skipped": "no_audio"}}
+                )
+                logger.info("video_transcription_skipped", task_id=task_id, reason="no_audio")
+                return str(video_path)
+
+            speech_regions = None
+            if settings.vad_enabled:
+                await self.task_manager.update_task(
+                    task_id,
+                    progress=15.0,
+                    message="Detecting speech"
+                )
+                with observe_stage("vad"):
+                    _, speech_regions = await get_voice_activity_detector().detect_file(audio_path)
             
             await self.task_manager.update_task(
                 task_id,
@@ -45,19 +134,28 @@ class CaptionOrchestrator:
                 message="Transcribing audio"
             )
             
-            transcription = await self.transcription_service.transcribe(audio_path)
+            transcription = await self.transcription_service.transcribe(
+                audio_path,
+                language=language,
+                speech_regions=speech_regions,
+                profile=transcription_profile
+            )
 
             await self.task_manager.update_task(
                 task_id,
                 status=TaskStatusEnum.COMPLETED,
                 progress=100.0,
                 message="Transcription complete, ready for editing",
-                transcription=transcription
+                transcription=transcription,
+                metadata={"transcription": transcription.metrics}
             )
             
             await self.storage_service.delete_file(audio_path)
             
             logger.info("video_transcription_complete", task_id=task_id)
+
+            if settings.speculative_render_enabled and transcription.segments:
+                self._schedule_speculative_render(task_id)
             
             return str(video_path)
             
@@ -74,10 +172,20 @@ class CaptionOrchestrator:
     async def reprocess_with_edited_transcription(
         self,
         new_task_id: str,
-        segments_data: list[dict],
-        new_config: CaptionConfig
+        segments_data: Optional[list[dict]],
+        new_config: CaptionConfig,
+        render_profile: RenderProfile = RenderProfile.FINAL,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        output_mode: CaptionOutputMode = CaptionOutputMode.BURN_IN,
+        output_preset: Optional[OutputPreset] = None,
+        transcription: Optional[Transcription] = None
     ) -> str:
-        """Re-process video with edited transcription and updated caption config"""
+        """Re-process video with edited transcription and updated caption config.
+
+        Pass ``transcription`` instead of ``segments_data`` to render a stored
+        transcription as-is.
+        """
         try:
             # Get the new task (which already has input_path set)
             new_task = await self.task_manager.get_task(new_task_id)
@@ -91,28 +199,7 @@ class CaptionOrchestrator:
             if not video_path.exists():
                 raise VideoProcessingError(f"Video file not found: {video_path}")
 
-            # Convert segments data to Transcription object
-            segments = [
-                TranscriptionSegment(
-                    start=seg["start"],
-                    end=seg["end"],
-                    text=seg["text"],
-                    words=seg.get("words", [])
-                )
-                for seg in segments_data
-            ]
-
-            # Determine duration from segments
-            duration = max([seg["end"] for seg in segments_data]) if segments_data else 0
-
-            # Determine language (default to "en")
-            language = "en"
-
-            edited_transcription = Transcription(
-                segments=segments,
-                language=language,
-                duration=duration
-            )
+            edited_transcription = transcription or self._build_transcription(segments_data)
 
             await self.task_manager.update_task(
                 new_task_id,
@@ -122,14 +209,53 @@ class CaptionOrchestrator:
                 transcription=edited_transcription
             )
 
-            output_path = self.storage_service.get_output_path(video_path.name)
+            prefix = "preview_" if render_profile == RenderProfile.PREVIEW else "captioned_"
+            output_path = self.storage_service.get_output_path(video_path.name, prefix=prefix)
 
-            await self.video_processor.add_captions(
-                video_path,
-                output_path,
-                edited_transcription,
-                new_config
-            )
+            async def _produce(path: Path):
+                started = time.perf_counter()
+                with self._foreground():
+                    if output_mode == CaptionOutputMode.SOFT:
+                        stats = await self.video_processor.mux_subtitles(
+                            video_path,
+                            path,
+                            edited_transcription,
+                            new_config,
+                            progress_callback=self._progress_reporter(new_task_id)
+                        )
+                        path = stats.pop("output_path")
+                        stats = {"mode": "soft", **stats}
+                    else:
+                        stats = await self._render(
+                            new_task,
+                            video_path,
+                            path,
+                            edited_transcription,
+                            new_config,
+                            render_profile,
+                            start,
+                            end,
+                            output_preset
+                        )
+                RENDER_DURATION.labels(mode=stats["mode"]).observe(time.perf_counter() - started)
+                return path, stats
+
+            render_cache = get_render_cache()
+            if render_cache.enabled:
+                cache_key = await render_cache.make_key(
+                    video_path,
+                    edited_transcription,
+                    new_config,
+                    render_profile=render_profile.value,
+                    output_mode=output_mode.value,
+                    output_preset=output_preset.value if output_preset else None,
+                    start=start,
+                    end=end,
+                    clip=[new_task.clip_start, new_task.clip_end]
+                )
+                output_path, render_stats = await render_cache.fetch(cache_key, output_path, _produce)
+            else:
+                output_path, render_stats = await _produce(output_path)
 
             await self.task_manager.update_task(
                 new_task_id,
@@ -137,7 +263,8 @@ class CaptionOrchestrator:
                 progress=100.0,
                 message="Reprocessing complete",
                 output_path=str(output_path),
-                result_url=f"/api/v1/videos/download/{output_path.name}"
+                result_url=f"/api/v1/videos/download/{output_path.name}",
+                metadata={"render": render_stats}
             )
 
             logger.info("video_reprocessing_complete", task_id=new_task_id, output=str(output_path))
@@ -155,6 +282,319 @@ class CaptionOrchestrator:
             raise VideoProcessingError(f"Video reprocessing failed: {str(e)}")
 
 
+    async def render_variants(
+        self,
+        new_task_id: str,
+        segments_data: Optional[list[dict]],
+        variants: List[RenderVariant],
+        render_profile: RenderProfile = RenderProfile.FINAL,
+        transcription: Optional[Transcription] = None
+    ) -> str:
+        """Render every variant of one video from a single ffmpeg pass."""
+        try:
+            new_task = await self.task_manager.get_task(new_task_id)
+            if not new_task:
+                raise VideoProcessingError(f"Task {new_task_id} not found")
+
+            video_path = Path(new_task.input_path)
+            if not video_path.exists():
+                raise VideoProcessingError(f"Video file not found: {video_path}")
+
+            transcription = transcription or self._build_transcription(segments_data)
+            await self.task_manager.update_task(
+                new_task_id,
+                status=TaskStatusEnum.RENDERING,
+                progress=70.0,
+                message=f"Rendering {len(variants)} caption variants",
+                transcription=transcription
+            )
+
+            output_paths = []
+            for i, variant in enumerate(variants):
+                prefix = f"{variant.name or f'variant{i + 1}'}_"
+                output_paths.append(self.storage_service.get_output_path(video_path.name, prefix=prefix))
+
+            started = time.perf_counter()
+            with self._foreground():
+                results = await self.video_processor.add_captions_variants(
+                    video_path,
+                    variants,
+                    output_paths,
+                    transcription,
+                    render_profile=render_profile,
+                    progress_callback=self._progress_reporter(new_task_id),
+                    source_offset=new_task.clip_offset,
+                    duration=new_task.clip_length
+                )
+            RENDER_DURATION.labels(mode="variants").observe(time.perf_counter() - started)
+
+            outputs = []
+            for i, result in enumerate(results):
+                output_path = result["output_path"]
+                outputs.append({
+                    "name": result["name"] or f"variant{i + 1}",
+                    "width": result["width"],
+                    "height": result["height"],
+                    "result_url": f"/api/v1/videos/download/{output_path.name}",
+                })
+
+            await self.task_manager.update_task(
+                new_task_id,
+                status=TaskStatusEnum.COMPLETED,
+                progress=100.0,
+                message="Variant rendering complete",
+                output_path=str(output_paths[0]),
+                result_url=outputs[0]["result_url"],
+                metadata={
+                    "render": {"mode": "variants", "profile": render_profile.value},
+                    "variants": outputs,
+                }
+            )
+
+            logger.info("video_variants_complete", task_id=new_task_id, variants=len(outputs))
+            return new_task_id
+
+        except Exception as e:
+            logger.error("video_variants_failed", task_id=new_task_id, error=str(e))
+            await self.task_manager.update_task(
+                new_task_id,
+                status=TaskStatusEnum.FAILED,
+                error=str(e),
+                message="Variant rendering failed"
+            )
+            raise VideoProcessingError(f"Variant rendering failed: {str(e)}")
+
+    def _schedule_speculative_render(self, task_id: str):
+        if not get_render_cache().enabled:
+            return
+        self._speculative_queue.append(task_id)
+        if self._speculative_worker is None or self._speculative_worker.done():
+            self._speculative_worker = asyncio.create_task(self._run_speculative_renders())
+
+    async def _run_speculative_renders(self):
+        """Render queued tasks one at a time whenever no foreground work is running.
+
+        A job cancelled by foreground work stays queued and restarts once the
+        pipeline is idle again.
+        """
+        while self._speculative_queue:
+            await self._idle.wait()
+            task_id = self._speculative_queue[0]
+            self._speculative_job = asyncio.create_task(self._speculative_render(task_id))
+            await asyncio.wait([self._speculative_job])
+            if self._speculative_job.cancelled():
+                logger.info("speculative_render_preempted", task_id=task_id)
+                continue
+            self._speculative_queue.popleft()
+            if self._speculative_job.exception():
+                logger.warning(
+                    "speculative_render_failed",
+                    task_id=task_id,
+                    error=str(self._speculative_job.exception())
+                )
+
+    async def _speculative_render(self, task_id: str):
+        """Render the task's original style into the render cache at idle priority."""
+        task = await self.task_manager.get_task(task_id)
+        if not task or task.status != TaskStatusEnum.COMPLETED or not task.transcription or not task.input_path:
+            return
+
+        settings = get_settings()
+        video_path = Path(task.input_path)
+        config = CaptionConfig(**(task.caption_config or {}))
+        render_cache = get_render_cache()
+        # Same key /reprocess computes for an unedited, full-length final render.
+        cache_key = await render_cache.make_key(
+            video_path,
+            task.transcription,
+            config,
+            render_profile=RenderProfile.FINAL.value,
+            output_mode=CaptionOutputMode.BURN_IN.value,
+            output_preset=None,
+            start=None,
+            end=None,
+            clip=[task.clip_start, task.clip_end]
+        )
+
+        async def _produce(path: Path):
+            started = time.perf_counter()
+            with ffmpeg_priority(settings.speculative_render_niceness):
+                await self.video_processor.add_captions(
+                    video_path,
+                    path,
+                    task.transcription,
+                    config,
+                    end=task.clip_length,
+                    source_offset=task.clip_offset
+                )
+            RENDER_DURATION.labels(mode="speculative").observe(time.perf_counter() - started)
+            return path, {"mode": "full"}
+
+        output_path = self.storage_service.get_output_path(video_path.name, prefix="speculative_")
+        logger.info("speculative_render_started", task_id=task_id)
+        try:
+            cached_path, _ = await render_cache.fetch(cache_key, output_path, _produce)
+        finally:
+            # The cache keeps its own link to the file.
+            await self.storage_service.delete_file(output_path)
+        await self.storage_service.delete_file(cached_path)
+
+        await self.task_manager.update_task(
+            task_id,
+            metadata={"speculative_render": {"status": "ready", "cache_key": cache_key[:16]}}
+        )
+        logger.info("speculative_render_ready", task_id=task_id)
+
+    @staticmethod
+    def _build_transcription(segments_data: list[dict]) -> Transcription:
+        segments = [
+            TranscriptionSegment(
+                start=seg["start"],
+                end=seg["end"],
+                text=seg["text"],
+                words=seg.get("words", [])
+            )
+            for seg in segments_data
+        ]
+
+        # Determine duration from segments
+        duration = max([seg["end"] for seg in segments_data]) if segments_data else 0
+
+        # Determine language (default to "en")
+        language = "en"
+
+        return Transcription(
+            segments=segments,
+            language=language,
+            duration=duration
+        )
+
+    async def _render(
+        self,
+        task: VideoTask,
+        video_path: Path,
+        output_path: Path,
+        transcription: Transcription,
+        config: CaptionConfig,
+        render_profile: RenderProfile,
+        start: Optional[float],
+        end: Optional[float],
+        output_preset: Optional[OutputPreset] = None
+    ) -> dict:
+        """Pick the cheapest way to produce ``output_path`` and return its stats.
+
+        ``start``/``end`` are on the task's timeline, which for clipped tasks
+        begins at ``clip_start`` in the source.
+        """
+        full_length = start is None and end is None
+        clip_length = task.clip_length
+        render_stats = None
+        _on_progress = self._progress_reporter(task.id)
+
+        # Incremental and chunked renders splice whole sources at source geometry.
+        if render_profile == RenderProfile.FINAL and full_length and output_preset is None and clip_length is None:
+            previous_task = await self._previous_render(task, config)
+            if previous_task:
+                try:
+                    render_stats = await self.video_processor.add_captions_incremental(
+                        video_path,
+                        output_path,
+                        Path(previous_task.output_path),
+                        previous_task.transcription,
+                        transcription,
+                        config,
+                        progress_callback=_on_progress
+                    )
+                except VideoProcessingError as e:
+                    logger.warning("incremental_render_failed", task_id=task.id, error=str(e), details=e.details)
+
+            if render_stats is None and get_settings().render_parallel_chunks > 1:
+                render_stats = await self.video_processor.add_captions_chunked(
+                    video_path,
+                    output_path,
+                    transcription,
+                    config,
+                    progress_callback=_on_progress
+                )
+
+        if render_stats is None:
+            if clip_length is not None:
+                end = min(end, clip_length) if end is not None else clip_length
+            await self.video_processor.add_captions(
+                video_path,
+                output_path,
+                transcription,
+                config,
+                progress_callback=_on_progress,
+                render_profile=render_profile,
+                start=start,
+                end=end,
+                output_preset=output_preset,
+                source_offset=task.clip_offset
+            )
+            render_stats = {"mode": "full"}
+
+        render_stats["profile"] = render_profile.value
+        if output_preset:
+            render_stats["preset"] = output_preset.value
+        if not full_length:
+            render_stats["window"] = {"start": start, "end": end}
+        if clip_length is not None:
+            render_stats["clip"] = {"start": task.clip_offset, "end": task.clip_end}
+        return render_stats
+
+    def _progress_reporter(self, task_id: str):
+        async def _on_progress(fraction: float, stats: dict):
+            current = await self.task_manager.get_task(task_id)
+            if not current or current.status != TaskStatusEnum.RENDERING:
+                return
+            await self.task_manager.update_task(
+                task_id,
+                progress=round(70.0 + 29.0 * fraction, 1),
+                metadata={"render_progress": stats}
+            )
+        return _on_progress
+
+    async def _previous_render(self, task: VideoTask, config: CaptionConfig) -> Optional[VideoTask]:
+        """The earlier render this task can be spliced from, if any.
+
+        That is the parent itself when it was rendered, otherwise the newest
+        sibling render, e.g. the last render of a transcription edited with
+        PATCH.
+        """
+        if not get_settings().incremental_render_enabled or not task.parent_task_id:
+            return None
+
+        parent = await self.task_manager.get_task(task.parent_task_id)
+        if not parent:
+            return None
+        if parent.output_path:
+            return parent if self._reusable_render(parent, task, config) else None
+
+        for sibling in await self.task_manager.get_children(parent.id):
+            if sibling.id != task.id and self._reusable_render(sibling, task, config):
+                return sibling
+        return None
+
+    @staticmethod
+    def _reusable_render(candidate: VideoTask, task: VideoTask, config: CaptionConfig) -> bool:
+        return bool(
+            candidate.status == TaskStatusEnum.COMPLETED
+            and candidate.output_path
+            and candidate.transcription
+            # A PATCH after rendering means the output no longer matches the transcription.
+            and not candidate.transcription_changes
+            and candidate.input_path == task.input_path
+            and candidate.caption_config == config.model_dump()
+            and candidate.render_profile == RenderProfile.FINAL.value
+            and candidate.output_mode != CaptionOutputMode.SOFT.value
+            and not candidate.metadata.get("render", {}).get("window")
+            and not candidate.metadata.get("variants")
+            and not candidate.metadata.get("render", {}).get("preset")
+            and Path(candidate.output_path).exists()
+        )
+
+
 _orchestrator: Optional[CaptionOrchestrator] = None
 
 
@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.models import Transcription
+from app.schemas import CaptionConfig
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import record_cache_lookup
+
+logger = get_logger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    path: Path
+    size: int
+    last_access: float
+
+
+class RenderCache:
+    """Content-addressed store of finished renders.
+
+    Entries live in ``render_cache_dir`` as ``{key}{suffix}`` so the index can
+    be rebuilt from disk on startup. Hits are hard-linked into the output
+    directory, which keeps them valid after the cache evicts its copy.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        settings = get_settings()
+        self.enabled = settings.render_cache_enabled
+        self.cache_dir = Path(cache_dir or settings.render_cache_dir)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.render_cache_max_mb * 1024 * 1024
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._source_hashes: Dict[Tuple[str, int, int], str] = {}
+        if self.enabled:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def _load(self):
+        files = []
+        for path in self.cache_dir.iterdir():
+            if path.is_file():
+                stat = path.stat()
+                files.append((stat.st_atime, path, stat.st_size))
+        for last_access, path, size in sorted(files):
+            self._entries[path.stem] = CacheEntry(path=path, size=size, last_access=last_access)
+            self._size += size
+        self._evict()
+
+    async def source_hash(self, path: Path) -> str:
+        stat = path.stat()
+        identity = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+        cached = self._source_hashes.get(identity)
+        if cached:
+            return cached
+
+        def _hash_file():
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            return digest.hexdigest()
+
+        value = await asyncio.to_thread(_hash_file)
+        self._source_hashes[identity] = value
+        return value
+
+    @staticmethod
+    def transcription_hash(transcription: Transcription) -> str:
+        canonical = [
+            [
+                round(seg.start, 3),
+                round(seg.end, 3),
+                seg.text.strip(),
+                [
+                    [word.get("word", "").strip(), round(word.get("start", 0.0), 3), round(word.get("end", 0.0), 3)]
+                    for word in seg.words
+                ],
+            ]
+            for seg in transcription.segments
+        ]
+        return hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode()).hexdigest()
+
+    async def make_key(
+        self,
+        video_path: Path,
+        transcription: Transcription,
+        config: CaptionConfig,
+        **options
+    ) -> str:
+        payload = {
+            "source": await self.source_hash(video_path),
+            "transcription": self.transcription_hash(transcription),
+            "config": config.model_dump(mode="json"),
+            "options": options,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.path.exists():
+            self._entries.pop(key)
+            self._size -= entry.size
+            return None
+        entry.last_access = time.time()
+        self._entries.move_to_end(key)
+        return entry
+
+    def _register(self, key: str, cache_path: Path):
+        size = cache_path.stat().st_size
+        previous = self._entries.pop(key, None)
+        if previous:
+            self._size -= previous.size
+        self._entries[key] = CacheEntry(path=cache_path, size=size, last_access=time.time())
+        self._size += size
+        self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self._size -= entry.size
+            try:
+                entry.path.unlink()
+            except FileNotFoundError:
+                pass
+            logger.info("render_cache_evicted", key=key[:16], size=entry.size)
+
+    async def fetch(
+        self,
+        key: str,
+        output_path: Path,
+        render: Callable[[Path], Awaitable[Tuple[Path, dict]]]
+    ) -> Tuple[Path, dict]:
+        """Return a finished render for ``key``, running ``render`` only on a miss.
+
+        Concurrent calls with the same key wait for the first one instead of
+        encoding the same output twice.
+        """
+        while True:
+            entry = self._lookup(key)
+            if entry:
+                target = output_path.with_suffix(entry.path.suffix)
+                try:
+                    await asyncio.to_thread(_link_or_copy, entry.path, target)
+                except FileNotFoundError:
+                    # Evicted while linking; look it up again.
+                    continue
+                record_cache_lookup("render", hit=True)
+                logger.info("render_cache_hit", key=key[:16], output_path=str(target))
+                return target, {"mode": "cached", "cache_key": key[:16]}
+
+            leader = self._inflight.get(key)
+            if leader is None:
+                break
+            logger.info("render_cache_collapsed", key=key[:16])
+            # A failed leader resolves to False; fall through and render ourselves.
+            await asyncio.shield(leader)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        record_cache_lookup("render", hit=False)
+        logger.info("render_cache_miss", key=key[:16])
+        try:
+            rendered_path, stats = await render(output_path)
+            cache_path = self.cache_dir / f"{key}{rendered_path.suffix}"
+            await asyncio.to_thread(_link_or_copy, rendered_path, cache_path)
+            self._register(key, cache_path)
+            future.set_result(True)
+        except BaseException:
+            future.set_result(False)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        stats["cache_key"] = key[:16]
+        return rendered_path, stats
+
+
+def _link_or_copy(source: Path, target: Path):
+    if target.exists():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache()
+    return _render_cache
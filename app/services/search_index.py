@@ -0,0 +1,199 @@
+import re
+import sys
+from array import array
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Tuple
+
+from app.models import Transcription
+from app.core.config import get_settings
+
+TOKEN_PATTERN = re.compile(r"\w+(?:['’]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return [token.replace("’", "'") for token in TOKEN_PATTERN.findall(text.casefold())]
+
+
+@dataclass
+class IndexedDocument:
+    """Token stream of one task's transcription; postings point into it."""
+    tokens: List[str]
+    segments: array
+    starts: array
+    ends: array
+    derived: bool
+
+
+@dataclass
+class SearchHit:
+    task_id: str
+    segment: int
+    start: float
+    end: float
+    text: str
+
+
+def _timed_tokens(transcription: Transcription) -> Iterator[Tuple[str, int, float, float]]:
+    """(token, segment index, start, end) in transcript order.
+
+    Segments without word timings get times interpolated over the segment
+    by character length, as the caption layout does.
+    """
+    for index, segment in enumerate(transcription.segments):
+        if segment.words:
+            for word in segment.words:
+                for token in tokenize(word.get("word", "")):
+                    yield token, index, word["start"], word["end"]
+            continue
+
+        tokens = tokenize(segment.text)
+        total_chars = sum(len(token) for token in tokens)
+        current = segment.start
+        for token in tokens:
+            token_end = current + (segment.end - segment.start) * len(token) / total_chars
+            yield token, index, current, token_end
+            current = token_end
+
+
+class TranscriptionSearchIndex:
+    """Inverted word index over every stored transcription.
+
+    ``postings[term][task_id]`` holds the positions of ``term`` in that
+    task's token stream, so phrases are consecutive positions. ``vocabulary``
+    is kept sorted for prefix lookups. Tasks are re-indexed individually
+    whenever their transcription is replaced.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.max_prefix_terms = settings.search_max_prefix_terms
+        self.documents: Dict[str, IndexedDocument] = {}
+        self.postings: Dict[str, Dict[str, array]] = {}
+        self.vocabulary: List[str] = []
+
+    @property
+    def word_count(self) -> int:
+        return sum(len(document.tokens) for document in self.documents.values())
+
+    def index(self, task_id: str, transcription: Transcription, derived: bool = False):
+        self.add(task_id, self.build(transcription, derived))
+
+    @staticmethod
+    def build(transcription: Transcription, derived: bool = False) -> IndexedDocument:
+        """Tokenize ``transcription`` without touching the index."""
+        document = IndexedDocument(
+            tokens=[],
+            segments=array("I"),
+            starts=array("d"),
+            ends=array("d"),
+            derived=derived,
+        )
+        for token, segment, start, end in _timed_tokens(transcription):
+            # One string object per distinct term instead of one per occurrence.
+            document.tokens.append(sys.intern(token))
+            document.segments.append(segment)
+            document.starts.append(start)
+            document.ends.append(end)
+        return document
+
+    def add(self, task_id: str, document: IndexedDocument):
+        """Replace the task's entry with a document from ``build``."""
+        self.remove(task_id)
+        for position, token in enumerate(document.tokens):
+            by_task = self.postings.get(token)
+            if by_task is None:
+                by_task = self.postings[token] = {}
+                insort(self.vocabulary, token)
+            positions = by_task.get(task_id)
+            if positions is None:
+                positions = by_task[task_id] = array("I")
+            positions.append(position)
+        self.documents[task_id] = document
+
+    def remove(self, task_id: str):
+        document = self.documents.pop(task_id, None)
+        if document is None:
+            return
+        for token in set(document.tokens):
+            by_task = self.postings[token]
+            by_task.pop(task_id, None)
+            if not by_task:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def _expand(self, term: str) -> List[str]:
+        """Vocabulary terms a query term matches; ``foo*`` is a prefix query."""
+        if not term.endswith("*"):
+            return [term] if term in self.postings else []
+        prefix = term.rstrip("*")
+        start = bisect_left(self.vocabulary, prefix)
+        terms = []
+        for candidate in self.vocabulary[start:start + self.max_prefix_terms]:
+            if not candidate.startswith(prefix):
+                break
+            terms.append(candidate)
+        return terms
+
+    def _positions(self, terms: List[str], task_id: str) -> List[int]:
+        lists = [self.postings[term][task_id] for term in terms if task_id in self.postings[term]]
+        if len(lists) == 1:
+            return lists[0]
+        return sorted(position for positions in lists for position in positions)
+
+    def search(self, query: str, limit: int = 50, include_derived: bool = False) -> Tuple[List[SearchHit], bool]:
+        """Occurrences of the words of ``query`` as a consecutive phrase.
+
+        A trailing ``*`` turns a query word into a prefix. Returns at most
+        ``limit`` hits and whether more were available.
+        """
+        parts = []
+        for raw in query.split():
+            tokens = tokenize(raw)
+            if tokens and raw.endswith("*"):
+                tokens[-1] += "*"
+            parts += tokens
+        if not parts:
+            return [], False
+
+        expanded = [self._expand(part) for part in parts]
+        if not all(expanded):
+            return [], False
+
+        # Only tasks containing every query word can match.
+        candidates = None
+        for terms in expanded:
+            tasks = set()
+            for term in terms:
+                tasks.update(self.postings[term])
+            candidates = tasks if candidates is None else candidates & tasks
+
+        hits: List[SearchHit] = []
+        for task_id, document in self.documents.items():
+            if task_id not in candidates or (document.derived and not include_derived):
+                continue
+            lists = [self._positions(terms, task_id) for terms in expanded]
+            # Walk the rarest word and probe the others by binary search.
+            anchor = min(range(len(lists)), key=lambda i: len(lists[i]))
+            for position in lists[anchor]:
+                first = position - anchor
+                if first < 0 or not all(
+                    _contains(lists[i], first + i) for i in range(len(lists)) if i != anchor
+                ):
+                    continue
+                last = first + len(lists) - 1
+                if len(hits) == limit:
+                    return hits, True
+                hits.append(SearchHit(
+                    task_id=task_id,
+                    segment=document.segments[first],
+                    start=document.starts[first],
+                    end=document.ends[last],
+                    text=" ".join(document.tokens[first:last + 1]),
+                ))
+        return hits, False
+
+
+def _contains(positions, value: int) -> bool:
+    index = bisect_left(positions, value)
+    return index < len(positions) and positions[index] == value
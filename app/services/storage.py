@@ -8,6 +8,7 @@ import uuid
 
 from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import observe_stage
 from app.core.exceptions import StorageError
 
 logger = get_logger(__name__)
@@ -33,9 +34,10 @@ class StorageService:
             safe_filename = self.generate_filename(filename, "upload_")
             file_path = Path(self.settings.upload_dir) / safe_filename
 
-            content = file.read()
-            async with aiofiles.open(file_path, "wb") as f:
-                await f.write(content)
+            with observe_stage("upload_save"):
+                content = file.read()
+                async with aiofiles.open(file_path, "wb") as f:
+                    await f.write(content)
 
             logger.info("file_saved", path=str(file_path), size=len(content))
             return file_path
@@ -44,8 +46,8 @@ class StorageService:
             logger.error("file_save_failed", error=str(e))
             raise StorageError(f"Failed to save file: {str(e)}")
     
-    def get_output_path(self, input_filename: str) -> Path:
-        safe_filename = self.generate_filename(input_filename, "captioned_")
+    def get_output_path(self, input_filename: str, prefix: str = "captioned_") -> Path:
+        safe_filename = self.generate_filename(input_filename, prefix)
         return Path(self.settings.output_dir) / safe_filename
     
     def get_temp_path(self, filename: str) -> Path:
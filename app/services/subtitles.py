@@ -0,0 +1,340 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from app.models import Transcription
+from app.schemas import CaptionConfig, CaptionStyle, CaptionPosition, FontWeight
+from app.core.config import get_settings
+
+
+class CaptionStyler:
+    STYLE_PRESETS = {
+        CaptionStyle.TIKTOK: {
+            "font": "Arial",
+            "font_size": 52,
+            "font_color": "#FFFFFF",
+            "stroke_color": "#000000",
+            "stroke_width": 4,
+            "background_color": None,
+            "highlight_color": "#00FF00",
+            "shadow": True,
+        },
+        CaptionStyle.INSTAGRAM: {
+            "font": "Helvetica",
+            "font_size": 48,
+            "font_color": "#FFFFFF",
+            "stroke_color": "#000000",
+            "stroke_width": 3,
+            "background_color": "#000000",
+            "background_opacity": 0.5,
+            "highlight_color": "#FF6B6B",
+            "shadow": False,
+        },
+        CaptionStyle.YOUTUBE_SHORTS: {
+            "font": "Impact",
+            "font_size": 56,
+            "font_color": "#FFFFFF",
+            "stroke_color": "#000000",
+            "stroke_width": 5,
+            "background_color": None,
+            "highlight_color": "#FFD700",
+            "shadow": True,
+        },
+        CaptionStyle.MINIMAL: {
+            "font": "Arial",
+            "font_size": 36,
+            "font_color": "#FFFFFF",
+            "stroke_color": "#333333",
+            "stroke_width": 1,
+            "background_color": None,
+            "highlight_color": "#FFFFFF",
+            "shadow": False,
+        },
+        CaptionStyle.BOLD: {
+            "font": "Impact",
+            "font_size": 64,
+            "font_color": "#FFFF00",
+            "stroke_color": "#000000",
+            "stroke_width": 6,
+            "background_color": None,
+            "highlight_color": "#FF0000",
+            "shadow": True,
+        },
+        CaptionStyle.NEON: {
+            "font": "Arial",
+            "font_size": 48,
+            "font_color": "#00FFFF",
+            "stroke_color": "#FF00FF",
+            "stroke_width": 3,
+            "background_color": None,
+            "highlight_color": "#00FF00",
+            "shadow": True,
+        },
+    }
+    
+    @classmethod
+    def get_style(cls, config: CaptionConfig) -> dict:
+        preset = cls.STYLE_PRESETS.get(config.style, cls.STYLE_PRESETS[CaptionStyle.TIKTOK]).copy()
+        
+        if config.font_size:
+            preset["font_size"] = config.font_size
+        if config.font_color:
+            preset["font_color"] = config.font_color
+        if config.stroke_color:
+            preset["stroke_color"] = config.stroke_color
+        if config.stroke_width is not None:
+            preset["stroke_width"] = config.stroke_width
+        if config.background_color:
+            preset["background_color"] = config.background_color
+        if config.highlight_color:
+            preset["highlight_color"] = config.highlight_color
+            
+        return preset
+
+
+@dataclass
+class CaptionWord:
+    text: str
+    start: float
+    end: float
+
+
+@dataclass
+class CaptionLine:
+    start: float
+    end: float
+    words: List[CaptionWord] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return " ".join(w.text for w in self.words)
+
+
+def build_caption_lines(transcription: Transcription, config: CaptionConfig) -> List[CaptionLine]:
+    """Split a transcription into on-screen lines with per-word timings.
+
+    Segments with word timestamps (and highlighting enabled) are grouped into
+    lines of ``max_words_per_line`` words. Otherwise the segment text is chunked
+    evenly over the segment and word timings are interpolated by character length.
+    """
+    lines: List[CaptionLine] = []
+    max_words = config.max_words_per_line
+
+    for segment in transcription.segments:
+        if config.highlight_current_word and segment.words:
+            words = segment.words
+            for i in range(0, len(words), max_words):
+                line_words = [
+                    CaptionWord(text=w["word"], start=w["start"], end=w["end"])
+                    for w in words[i:i + max_words]
+                ]
+                lines.append(CaptionLine(start=line_words[0].start, end=line_words[-1].end, words=line_words))
+            continue
+
+        words = segment.text.split()
+        if not words:
+            continue
+
+        chunks = [words[i:i + max_words] for i in range(0, len(words), max_words)]
+        chunk_duration = (segment.end - segment.start) / len(chunks)
+
+        for i, chunk_words in enumerate(chunks):
+            chunk_start = segment.start + i * chunk_duration
+            total_chars = sum(len(w) for w in chunk_words)
+
+            line_words = []
+            current = chunk_start
+            for w_text in chunk_words:
+                w_end = current + (len(w_text) / total_chars) * chunk_duration
+                line_words.append(CaptionWord(text=w_text, start=current, end=w_end))
+                current = w_end
+            lines.append(CaptionLine(start=chunk_start, end=chunk_start + chunk_duration, words=line_words))
+
+    return lines
+
+
+def shift_caption_lines(lines: Iterable[CaptionLine], start: float, end: float) -> List[CaptionLine]:
+    """Lines overlapping ``[start, end)``, moved onto a timeline that begins at ``start``."""
+    shifted = []
+    for line in lines:
+        if line.end <= start or line.start >= end:
+            continue
+        words = [CaptionWord(text=w.text, start=w.start - start, end=w.end - start) for w in line.words]
+        shifted.append(CaptionLine(start=max(line.start - start, 0.0), end=line.end - start, words=words))
+    return shifted
+
+
+def format_ass_time(seconds: float) -> str:
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    centisecs = int((seconds % 1) * 100)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centisecs:02d}"
+
+
+def _format_timestamp(seconds: float, separator: str) -> str:
+    millis = int(round(max(seconds, 0.0) * 1000))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
+
+
+def render_srt(lines: Iterable[CaptionLine]) -> str:
+    cues = []
+    for index, line in enumerate((line for line in lines if line.words), start=1):
+        cues.append(
+            f"{index}\n"
+            f"{_format_timestamp(line.start, ',')} --> {_format_timestamp(line.end, ',')}\n"
+            f"{line.text}\n"
+        )
+    return "\n".join(cues)
+
+
+def render_webvtt(lines: Iterable[CaptionLine]) -> str:
+    cues = ["WEBVTT\n"]
+    for line in lines:
+        if not line.words:
+            continue
+        cues.append(
+            f"{_format_timestamp(line.start, '.')} --> {_format_timestamp(line.end, '.')}\n"
+            f"{line.text}\n"
+        )
+    return "\n".join(cues)
+
+
+def render_json(lines: Iterable[CaptionLine]) -> str:
+    return json.dumps([
+        {
+            "start": round(line.start, 3),
+            "end": round(line.end, 3),
+            "text": line.text,
+            "words": [
+                {"text": w.text, "start": round(w.start, 3), "end": round(w.end, 3)}
+                for w in line.words
+            ],
+        }
+        for line in lines
+    ], ensure_ascii=False)
+
+
+def _ass_color(hex_color: str) -> str:
+    color = hex_color.lstrip("#")
+    return f"{color[4:6]}{color[2:4]}{color[0:2]}"
+
+
+class AssSubtitleWriter:
+    """Builds ASS subtitles for a list of caption lines.
+
+    The ``karaoke`` engine emits one ``Dialogue`` per line and switches the
+    highlight colour on each word with ``\\t`` tags. The ``per_word`` engine
+    emits one event per word with the whole line repeated, which is what the
+    renderer used originally; it is kept for comparison.
+    """
+
+    ENGINES = ("karaoke", "per_word")
+
+    def __init__(
+        self,
+        config: CaptionConfig,
+        video_width: int,
+        video_height: int,
+        engine: Optional[str] = None
+    ):
+        self.config = config
+        self.video_width = video_width
+        self.video_height = video_height
+        self.engine = engine or get_settings().subtitle_engine
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Unknown subtitle engine '{self.engine}'")
+
+        self.style = CaptionStyler.get_style(config)
+        self.font_color = _ass_color(self.style["font_color"])
+        self.stroke_color = _ass_color(self.style["stroke_color"])
+        self.highlight_color = _ass_color(self.style["highlight_color"])
+
+    def header(self) -> str:
+        style = self.style
+        config = self.config
+
+        if config.position == CaptionPosition.TOP:
+            alignment = 8
+            margin_v = 50
+        elif config.position == CaptionPosition.CENTER:
+            alignment = 5
+            margin_v = 0
+        else:
+            alignment = 2
+            margin_v = 80
+
+        bold = 1 if config.font_weight in [FontWeight.BOLD, FontWeight.BLACK] else 0
+        shadow = 1 if style.get("shadow") else 0
+
+        return f"""[Script Info]
+Title: Video Captions
+ScriptType: v4.00+
+PlayResX: {self.video_width}
+PlayResY: {self.video_height}
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,{style["font"]},{style["font_size"]},&H00{self.font_color},&H000000FF,&H00{self.stroke_color},&H80000000,{bold},0,0,0,100,100,0,0,1,{style["stroke_width"]},{shadow},{alignment},20,20,{margin_v},1
+Style: Highlight,{style["font"]},{style["font_size"]},&H00{self.highlight_color},&H000000FF,&H00{self.stroke_color},&H80000000,{bold},0,0,0,100,100,0,0,1,{style["stroke_width"]},{shadow},{alignment},20,20,{margin_v},1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+    def _karaoke_event(self, line: CaptionLine) -> str:
+        start_time = format_ass_time(line.start)
+        # Tag offsets are relative to the event start as libass sees it,
+        # i.e. after truncation to centiseconds.
+        event_start = int(line.start * 100) / 100
+        highlight = f"\\1c&H{self.highlight_color}&"
+        default = f"\\1c&H{self.font_color}&"
+
+        parts = []
+        for word in line.words:
+            on = max(int(round((word.start - event_start) * 1000)), 0)
+            off = max(int(round((word.end - event_start) * 1000)), on + 1)
+            # Override tags carry over to the following words, so each word
+            # resets its colour first. \t(0,0,...) means "animate over the
+            # whole event" in libass, so every switch spans at least 1 ms.
+            parts.append(
+                f"{{{default}\\t({on},{on + 1},{highlight})\\t({off},{off + 1},{default})}}{word.text}"
+            )
+
+        return f"Dialogue: 0,{start_time},{format_ass_time(line.end)},Default,,0,0,0,,{' '.join(parts)}\n"
+
+    def _per_word_events(self, line: CaptionLine) -> Iterator[str]:
+        for i, word in enumerate(line.words):
+            if word.end <= 0:
+                continue
+            text = " ".join(
+                f"{{\\rHighlight}}{w.text}{{\\rDefault}}" if j == i else w.text
+                for j, w in enumerate(line.words)
+            )
+            yield (
+                f"Dialogue: 0,{format_ass_time(max(word.start, 0.0))},{format_ass_time(word.end)},"
+                f"Default,,0,0,0,,{text}\n"
+            )
+
+    def events(self, lines: Iterable[CaptionLine]) -> Iterator[str]:
+        for line in lines:
+            if not line.words:
+                continue
+            if self.engine == "karaoke":
+                yield self._karaoke_event(line)
+            else:
+                yield from self._per_word_events(line)
+
+    def render(self, lines: Iterable[CaptionLine]) -> str:
+        return "".join([self.header(), *self.events(lines)])
+
+    def write(self, lines: Iterable[CaptionLine], path: Path) -> Path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.header())
+            f.writelines(self.events(lines))
+        return path
@@ -1,9 +1,13 @@
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
 import asyncio
 
-from app.models import VideoTask, TaskStatusEnum, Transcription
+from app.models import VideoTask, TaskStatusEnum, Transcription, TranscriptionChange
+from app.services.search_index import TranscriptionSearchIndex
+from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import TASKS
+from app.core.exceptions import TaskNotFoundError, TranscriptionConflictError
 
 logger = get_logger(__name__)
 
@@ -12,16 +16,25 @@ class TaskManager:
     def __init__(self):
         self._tasks: Dict[str, VideoTask] = {}
         self._lock = asyncio.Lock()
+        self.search_index = TranscriptionSearchIndex()
+        for status in TaskStatusEnum:
+            TASKS.labels(status=status.value).set(0)
     
     async def create_task(self, **kwargs) -> VideoTask:
         async with self._lock:
             task = VideoTask(**kwargs)
             self._tasks[task.id] = task
+            TASKS.labels(status=task.status.value).inc()
             logger.info("task_created", task_id=task.id)
             return task
     
     async def get_task(self, task_id: str) -> Optional[VideoTask]:
         return self._tasks.get(task_id)
+
+    async def get_children(self, task_id: str) -> List[VideoTask]:
+        """Tasks derived from ``task_id``, most recently updated first."""
+        children = [task for task in self._tasks.values() if task.parent_task_id == task_id]
+        return sorted(children, key=lambda task: task.updated_at, reverse=True)
     
     async def update_task(
         self,
@@ -33,6 +46,7 @@ class TaskManager:
         result_url: Optional[str] = None,
         error: Optional[str] = None,
         transcription: Optional[Transcription] = None,
+        metadata: Optional[dict] = None,
         **kwargs
     ) -> Optional[VideoTask]:
         async with self._lock:
@@ -40,7 +54,14 @@ class TaskManager:
             if not task:
                 return None
 
-            if status is not None:
+            # Tokenize before changing anything, so a failure leaves the task as it was.
+            document = None
+            if transcription is not None:
+                document = self.search_index.build(transcription, derived=task.parent_task_id is not None)
+
+            if status is not None and status != task.status:
+                TASKS.labels(status=task.status.value).dec()
+                TASKS.labels(status=status.value).inc()
                 task.status = status
             if progress is not None:
                 task.progress = progress
@@ -54,6 +75,10 @@ class TaskManager:
                 task.error = error
             if transcription is not None:
                 task.transcription = transcription
+                task.transcription_version += 1
+                self.search_index.add(task_id, document)
+            if metadata is not None:
+                task.metadata.update(metadata)
 
             task.updated_at = datetime.utcnow()
 
@@ -66,10 +91,64 @@ class TaskManager:
 
             return task
     
+    async def patch_transcription(
+        self,
+        task_id: str,
+        version: int,
+        operations: Sequence,
+        apply: Callable[[Transcription, Sequence], Tuple[Transcription, List[Tuple[float, float]]]]
+    ) -> Tuple[VideoTask, TranscriptionChange]:
+        """Apply ``operations`` if the stored transcription is still at ``version``.
+
+        The check and the update happen under the task lock, so concurrent
+        editors cannot overwrite each other's changes. The new transcription,
+        its search entry and the change record are all built before the task
+        is touched, so a failing edit changes nothing.
+        """
+        async with self._lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                raise TaskNotFoundError(f"Task {task_id} not found")
+            if task.status in (TaskStatusEnum.PROCESSING, TaskStatusEnum.TRANSCRIBING, TaskStatusEnum.RENDERING):
+                raise TranscriptionConflictError(
+                    f"Task {task_id} is {task.status.value}; retry when it has finished",
+                    {"version": task.transcription_version}
+                )
+            if version != task.transcription_version:
+                raise TranscriptionConflictError(
+                    "Transcription was modified; reload it and reapply the edit",
+                    {"version": task.transcription_version}
+                )
+
+            transcription, intervals = apply(task.transcription, operations)
+            document = self.search_index.build(transcription, derived=task.parent_task_id is not None)
+            change = TranscriptionChange(
+                version=task.transcription_version + 1,
+                operations=[op.model_dump(exclude_none=True) for op in operations],
+                intervals=[[start, end] for start, end in intervals],
+            )
+
+            task.transcription = transcription
+            task.transcription_version = change.version
+            self.search_index.add(task_id, document)
+            task.transcription_changes.append(change)
+            del task.transcription_changes[:-get_settings().transcription_change_log_size]
+            task.updated_at = datetime.utcnow()
+
+            logger.info(
+                "transcription_patched",
+                task_id=task_id,
+                version=task.transcription_version,
+                operations=len(operations)
+            )
+            return task, change
+
     async def delete_task(self, task_id: str) -> bool:
         async with self._lock:
             if task_id in self._tasks:
-                del self._tasks[task_id]
+                task = self._tasks.pop(task_id)
+                TASKS.labels(status=task.status.value).dec()
+                self.search_index.remove(task_id)
                 logger.info("task_deleted", task_id=task_id)
                 return True
             return False
@@ -1,44 +1,232 @@
 import whisper
 import torch
 import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Deque, List, Optional
 from app.models import Transcription, TranscriptionSegment
+from app.schemas import TranscriptionProfile
+from app.services.transcription_batcher import TranscriptionBatcher
+from app.services.vad import SAMPLE_RATE, SpeechRegion, VoiceActivityDetector
 from app.core.logging import get_logger
 from app.core.exceptions import TranscriptionError
 from app.core.config import get_settings
+from app.core.metrics import TRANSCRIPTION_AUDIO_SECONDS, TRANSCRIPTION_REAL_TIME_FACTOR, observe_stage
 
 logger = get_logger(__name__)
 
 
+class CpuBudget:
+    """Admits transcription jobs against a fixed number of CPU threads.
+
+    torch's intra-op thread count is process-wide, so jobs only run side by
+    side when they use the same count; a job asking for a different count
+    waits for the running ones to finish. Jobs are admitted in arrival order.
+    """
+
+    def __init__(self, cores: int):
+        self.cores = cores
+        self.free = cores
+        self.running = 0
+        self.threads: Optional[int] = None
+        self._waiters: Deque[object] = deque()
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _fits(self, threads: int) -> bool:
+        return self.running == 0 or (self.threads == threads and self.free >= threads)
+
+    @asynccontextmanager
+    async def acquire(self, threads: int):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        condition = self._condition
+        ticket = object()
+        async with condition:
+            self._waiters.append(ticket)
+            try:
+                await condition.wait_for(lambda: self._waiters[0] is ticket and self._fits(threads))
+            finally:
+                self._waiters.remove(ticket)
+                condition.notify_all()
+            self.free -= threads
+            self.running += 1
+            self.threads = threads
+        try:
+            yield
+        finally:
+            async with condition:
+                self.free += threads
+                self.running -= 1
+                if not self.running:
+                    self.threads = None
+                condition.notify_all()
+
+
 class TranscriptionService:
+    # ``cpu_share`` scales the per-job thread share of the CPU-optimization
+    # budget: draft jobs take half a share, accurate jobs (beam search) two.
+    # Without CPU optimization torch keeps its own thread default.
+    PROFILES = {
+        TranscriptionProfile.DRAFT: {
+            "beam_size": None,
+            "best_of": None,
+            "temperature": (0.0,),
+            "condition_on_previous_text": False,
+            "word_timestamps": False,
+            "cpu_share": 0.5,
+        },
+        TranscriptionProfile.BALANCED: {
+            "beam_size": None,
+            "best_of": 2,
+            "temperature": (0.0, 0.4, 0.8),
+            "condition_on_previous_text": False,
+            "word_timestamps": True,
+            "cpu_share": 1.0,
+        },
+        TranscriptionProfile.ACCURATE: {
+            "beam_size": 5,
+            "best_of": 5,
+            "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+            "condition_on_previous_text": True,
+            "word_timestamps": True,
+            "cpu_share": 2.0,
+        },
+    }
+
     def __init__(self, model_name: Optional[str] = None):
         settings = get_settings()
         self.model_name = model_name or settings.whisper_model
         self._model = None
+        self.quantized = False
+        self.cpu_optimization = settings.transcription_cpu_optimization
+        self.max_concurrency = max(1, settings.transcription_max_concurrency)
+        self.cores = settings.transcription_cpu_cores or os.cpu_count() or 1
+        self.threads_per_job = max(1, self.cores // self.max_concurrency) if self.cpu_optimization else None
+        self.cpu_budget = CpuBudget(self.cores) if self.cpu_optimization else None
+        self.batcher: Optional[TranscriptionBatcher] = None
+        if settings.transcription_batching_enabled:
+            self.batcher = TranscriptionBatcher(self)
     
     @property
     def model(self):
         if self._model is None:
             logger.info("loading_whisper_model", model=self.model_name)
             device = "cuda" if torch.cuda.is_available() else "cpu"
-            self._model = whisper.load_model(self.model_name, device=device)
-            logger.info("whisper_model_loaded", model=self.model_name, device=device)
+            model = whisper.load_model(self.model_name, device=device)
+            if self.cpu_optimization and device == "cpu":
+                model = self._optimize_for_cpu(model)
+            self._model = model
+            logger.info(
+                "whisper_model_loaded",
+                model=self.model_name,
+                device=device,
+                quantized=self.quantized,
+                threads_per_job=self.threads_per_job
+            )
         return self._model
+
+    def _optimize_for_cpu(self, model):
+        try:
+            # Inter-op threads can only be set before torch starts any parallel work.
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            logger.warning("torch_interop_threads_already_set")
+
+        # Whisper subclasses nn.Linear only to cast weights to the input dtype;
+        # quantize_dynamic swaps exact nn.Linear instances, so demote them first.
+        for module in model.modules():
+            if isinstance(module, torch.nn.Linear) and type(module) is not torch.nn.Linear:
+                module.__class__ = torch.nn.Linear
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.quantized = True
+        return model
+
+    @asynccontextmanager
+    async def cpu_slot(self, threads: Optional[int]):
+        """Hold ``threads`` of the CPU budget; a no-op without CPU optimization."""
+        if self.cpu_budget is None or threads is None:
+            yield
+            return
+        async with self.cpu_budget.acquire(threads):
+            yield
+
+    @classmethod
+    def resolve_profile(cls, profile: Optional[TranscriptionProfile] = None) -> TranscriptionProfile:
+        if profile is None:
+            profile = TranscriptionProfile(get_settings().transcription_profile)
+        return TranscriptionProfile(profile)
+
+    def threads_for(self, cpu_share: float) -> Optional[int]:
+        """Torch threads for a job, or None to leave torch's default."""
+        if self.threads_per_job is None:
+            return None
+        return max(1, min(self.cores, round(self.threads_per_job * cpu_share)))
+
+    @classmethod
+    def get_profile_options(cls, profile: Optional[TranscriptionProfile] = None) -> dict:
+        return cls.PROFILES[cls.resolve_profile(profile)].copy()
     
-    async def transcribe(self, audio_path: Path, language: Optional[str] = None) -> Transcription:
+    async def transcribe(
+        self,
+        audio_path: Path,
+        language: Optional[str] = None,
+        speech_regions: Optional[List[SpeechRegion]] = None,
+        profile: Optional[TranscriptionProfile] = None
+    ) -> Transcription:
         try:
-            logger.info("starting_transcription", audio_path=str(audio_path))
-            
+            profile = self.resolve_profile(profile)
+            options = self.get_profile_options(profile)
+            threads = self.threads_for(options.pop("cpu_share"))
+            logger.info(
+                "starting_transcription",
+                audio_path=str(audio_path),
+                profile=profile.value,
+                language=language
+            )
+
+            if speech_regions is not None and not speech_regions:
+                logger.info("transcription_skipped_no_speech", audio_path=str(audio_path))
+                return Transcription(segments=[], language=language or "en", duration=0.0)
+
+            def _load_audio():
+                if speech_regions is None:
+                    return whisper.load_audio(str(audio_path)), None
+                # Only the speech spans are decoded; timestamps are mapped
+                # back to the source timeline below.
+                return VoiceActivityDetector.compact(
+                    VoiceActivityDetector.load_audio(audio_path),
+                    speech_regions,
+                    gap=get_settings().vad_gap_seconds
+                )
+
+            audio, timeline = await asyncio.to_thread(_load_audio)
+
             def _run_transcribe():
+                if threads:
+                    torch.set_num_threads(threads)
                 return self.model.transcribe(
-                    str(audio_path),
+                    audio,
                     language=language,
-                    word_timestamps=True,
-                    verbose=False
+                    verbose=False,
+                    **options
                 )
 
-            result = await asyncio.to_thread(_run_transcribe)
+            started = time.perf_counter()
+            with observe_stage("transcription"):
+                if self.batcher and self.batcher.accepts(audio):
+                    result = await self.batcher.submit(audio, language, {**options, "threads": threads})
+                else:
+                    async with self.cpu_slot(threads):
+                        result = await asyncio.to_thread(_run_transcribe)
+            processing_seconds = time.perf_counter() - started
+            audio_seconds = len(audio) / SAMPLE_RATE
+            TRANSCRIPTION_AUDIO_SECONDS.labels(profile=profile.value).inc(audio_seconds)
+            if audio_seconds:
+                TRANSCRIPTION_REAL_TIME_FACTOR.labels(profile=profile.value).observe(processing_seconds / audio_seconds)
+            to_source = timeline.to_source if timeline else (lambda t: t)
             
             segments = []
             for seg in result["segments"]:
@@ -47,15 +235,15 @@ class TranscriptionService:
                     words = [
                         {
                             "word": w["word"].strip(),
-                            "start": w["start"],
-                            "end": w["end"]
+                            "start": to_source(w["start"]),
+                            "end": to_source(w["end"])
                         }
                         for w in seg["words"]
                     ]
                 
                 segments.append(TranscriptionSegment(
-                    start=seg["start"],
-                    end=seg["end"],
+                    start=to_source(seg["start"]),
+                    end=to_source(seg["end"]),
                     text=seg["text"].strip(),
                     words=words
                 ))
@@ -63,14 +251,23 @@ class TranscriptionService:
             transcription = Transcription(
                 segments=segments,
                 language=result.get("language", "en"),
-                duration=segments[-1].end if segments else 0.0
+                duration=segments[-1].end if segments else 0.0,
+                metrics={
+                    "profile": profile.value,
+                    "audio_seconds": round(audio_seconds, 3),
+                    "processing_seconds": round(processing_seconds, 3),
+                    "real_time_factor": round(processing_seconds / audio_seconds, 4) if audio_seconds else None,
+                    "quantized": self.quantized,
+                    "threads": threads,
+                }
             )
             
             logger.info(
                 "transcription_completed",
                 segments_count=len(segments),
                 language=transcription.language,
-                duration=transcription.duration
+                duration=transcription.duration,
+                real_time_factor=transcription.metrics["real_time_factor"]
             )
             
             return transcription
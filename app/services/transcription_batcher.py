@@ -0,0 +1,232 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+from whisper.audio import HOP_LENGTH, N_SAMPLES, SAMPLE_RATE, log_mel_spectrogram, pad_or_trim
+from whisper.decoding import DecodingOptions
+from whisper.timing import add_word_timestamps
+from whisper.tokenizer import get_tokenizer
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+if TYPE_CHECKING:
+    from app.services.transcription import TranscriptionService
+
+logger = get_logger(__name__)
+
+TIME_PRECISION = 0.02
+
+
+@dataclass
+class _BatchRequest:
+    audio: np.ndarray
+    language: Optional[str]
+    options: dict
+    future: asyncio.Future
+    windows: int = field(init=False)
+
+    def __post_init__(self):
+        self.windows = max(1, -(-len(self.audio) // N_SAMPLES))
+
+    @property
+    def key(self) -> Tuple:
+        return (
+            self.options.get("beam_size"),
+            self.options.get("temperature", (0.0,))[0],
+            self.options.get("word_timestamps", True),
+            self.options.get("threads"),
+        )
+
+
+class TranscriptionBatcher:
+    """Groups short clips from concurrent tasks into one batched Whisper decode.
+
+    Clips are cut into fixed 30 s windows and decoded together as a single
+    mel batch. Each batch uses one temperature (no fallback), which is why only
+    short clips are routed here; longer audio keeps using ``model.transcribe``.
+    Requests are grouped by decoding options and thread count, and each group
+    holds its threads of the service's CPU budget while it decodes.
+    """
+
+    def __init__(
+        self,
+        service: "TranscriptionService",
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[int] = None,
+        max_clip_seconds: Optional[float] = None,
+    ):
+        settings = get_settings()
+        self.service = service
+        self.max_batch_size = max_batch_size or settings.transcription_batch_size
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.transcription_batch_max_wait_ms) / 1000
+        self.max_clip_seconds = max_clip_seconds or settings.transcription_batch_max_clip_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def accepts(self, audio: np.ndarray) -> bool:
+        return 0 < len(audio) <= self.max_clip_seconds * SAMPLE_RATE
+
+    async def submit(self, audio: np.ndarray, language: Optional[str], options: dict) -> dict:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_BatchRequest(audio=audio, language=language, options=options, future=future))
+        return await future
+
+    async def _collect(self) -> List[_BatchRequest]:
+        batch = [await self._queue.get()]
+        windows = batch[0].windows
+        deadline = time.monotonic() + self.max_wait
+        while windows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            batch.append(request)
+            windows += request.windows
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            groups: Dict[Tuple, List[_BatchRequest]] = {}
+            for request in batch:
+                groups.setdefault(request.key, []).append(request)
+
+            for requests in groups.values():
+                start = time.perf_counter()
+                try:
+                    async with self.service.cpu_slot(requests[0].options.get("threads")):
+                        results = await asyncio.to_thread(self._transcribe_batch, requests)
+                except Exception as e:
+                    for request in requests:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+                    continue
+
+                logger.info(
+                    "transcription_batch_completed",
+                    clips=len(requests),
+                    windows=sum(r.windows for r in requests),
+                    elapsed_ms=round((time.perf_counter() - start) * 1000, 1)
+                )
+                for request, result in zip(requests, results):
+                    if not request.future.done():
+                        request.future.set_result(result)
+
+    def _transcribe_batch(self, requests: List[_BatchRequest]) -> List[dict]:
+        model = self.service.model
+        options = requests[0].options
+        threads = options.get("threads")
+        if threads:
+            torch.set_num_threads(threads)
+
+        # (request index, window offset in samples, window length in samples)
+        windows: List[Tuple[int, int, int]] = []
+        mels = []
+        for idx, request in enumerate(requests):
+            for offset in range(0, len(request.audio), N_SAMPLES):
+                chunk = request.audio[offset:offset + N_SAMPLES]
+                windows.append((idx, offset, len(chunk)))
+                mels.append(log_mel_spectrogram(pad_or_trim(chunk), model.dims.n_mels))
+        mel_batch = torch.stack(mels).to(model.device)
+
+        languages = [request.language for request in requests]
+        undetected = [i for i, lang in enumerate(languages) if lang is None]
+        if undetected:
+            if model.is_multilingual:
+                first_windows = [next(w for w, win in enumerate(windows) if win[0] == i) for i in undetected]
+                _, probs = model.detect_language(mel_batch[first_windows])
+                for i, prob in zip(undetected, probs):
+                    languages[i] = max(prob, key=prob.get)
+            else:
+                for i in undetected:
+                    languages[i] = "en"
+
+        segments: List[List[dict]] = [[] for _ in requests]
+        for language in set(languages):
+            window_ids = [w for w, win in enumerate(windows) if languages[win[0]] == language]
+            tokenizer = get_tokenizer(
+                model.is_multilingual,
+                num_languages=model.num_languages,
+                language=language,
+                task="transcribe"
+            )
+            decode_options = DecodingOptions(
+                task="transcribe",
+                language=language,
+                temperature=options.get("temperature", (0.0,))[0],
+                beam_size=options.get("beam_size"),
+                without_timestamps=False,
+                fp16=model.device.type == "cuda",
+            )
+            results = model.decode(mel_batch[window_ids], decode_options)
+
+            for w, result in zip(window_ids, results):
+                idx, offset, length = windows[w]
+                window_segments = self._parse_segments(result.tokens, tokenizer, offset, length)
+                if options.get("word_timestamps", True) and window_segments:
+                    add_word_timestamps(
+                        segments=window_segments,
+                        model=model,
+                        tokenizer=tokenizer,
+                        mel=mel_batch[w],
+                        num_frames=length // HOP_LENGTH,
+                        last_speech_timestamp=offset / SAMPLE_RATE,
+                    )
+                segments[idx].extend(window_segments)
+
+        return [
+            {"segments": request_segments, "language": language}
+            for request_segments, language in zip(segments, languages)
+        ]
+
+    @staticmethod
+    def _parse_segments(tokens: List[int], tokenizer, offset: int, length: int) -> List[dict]:
+        """Split a decoded window into segments on consecutive timestamp tokens,
+        mirroring the bookkeeping in ``whisper.transcribe``."""
+        seek = offset // HOP_LENGTH
+        time_offset = offset / SAMPLE_RATE
+        timestamp_begin = tokenizer.timestamp_begin
+
+        def _segment(start: float, end: float, segment_tokens: List[int]) -> dict:
+            text_tokens = [t for t in segment_tokens if t < tokenizer.eot]
+            return {
+                "seek": seek,
+                "start": time_offset + start,
+                "end": time_offset + end,
+                "text": tokenizer.decode(text_tokens),
+                "tokens": segment_tokens,
+            }
+
+        is_timestamp = [t >= timestamp_begin for t in tokens]
+        consecutive = [i + 1 for i in range(len(tokens) - 1) if is_timestamp[i] and is_timestamp[i + 1]]
+        segments = []
+        if consecutive:
+            if is_timestamp[-2:] == [False, True]:
+                consecutive.append(len(tokens))
+            last = 0
+            for current in consecutive:
+                sliced = tokens[last:current]
+                start = (sliced[0] - timestamp_begin) * TIME_PRECISION
+                end = (sliced[-1] - timestamp_begin) * TIME_PRECISION
+                segments.append(_segment(start, end, sliced))
+                last = current
+        else:
+            duration = length / SAMPLE_RATE
+            timestamps = [t for t in tokens if t >= timestamp_begin]
+            if timestamps and timestamps[-1] != timestamp_begin:
+                duration = (timestamps[-1] - timestamp_begin) * TIME_PRECISION
+            segments.append(_segment(0.0, duration, tokens))
+
+        return [seg for seg in segments if seg["text"].strip()]
@@ -0,0 +1,232 @@
+import asyncio
+import gzip
+import math
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Optional, Tuple
+
+import brotli
+import orjson
+
+from app.models import Transcription, TranscriptionSegment, VideoTask
+from app.schemas import TranscriptionLayout
+from app.services.transcription_index import get_transcription_index_cache
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import record_cache_lookup
+
+logger = get_logger(__name__)
+
+GZIP_LEVEL = 6
+# Higher qualities compress a few percent better at many times the CPU cost.
+BROTLI_QUALITY = 5
+
+
+@dataclass
+class EncodedTranscription:
+    body: bytes
+    etag: str
+    encoding: Optional[str]
+
+
+def rows_payload(segments: Iterable[TranscriptionSegment], indices: Optional[List[int]] = None) -> List[dict]:
+    rows = [
+        {
+            "start": seg.start,
+            "end": seg.end,
+            "text": seg.text,
+            "words": seg.words
+        }
+        for seg in segments
+    ]
+    if indices is not None:
+        rows = [{"index": index, **row} for index, row in zip(indices, rows)]
+    return rows
+
+
+def columnar_payload(segments: Iterable[TranscriptionSegment], indices: Optional[List[int]] = None) -> dict:
+    """Parallel arrays instead of one object per segment and word.
+
+    Words of segment ``i`` are ``words[*][word_offsets[i]:word_offsets[i + 1]]``.
+    """
+    seg_start, seg_end, seg_text, word_offsets = [], [], [], [0]
+    word_text, word_start, word_end = [], [], []
+    for seg in segments:
+        seg_start.append(seg.start)
+        seg_end.append(seg.end)
+        seg_text.append(seg.text)
+        for word in seg.words:
+            word_text.append(word.get("word", ""))
+            word_start.append(word.get("start"))
+            word_end.append(word.get("end"))
+        word_offsets.append(len(word_text))
+    columns = {"start": seg_start, "end": seg_end, "text": seg_text, "word_offsets": word_offsets}
+    if indices is not None:
+        columns = {"index": indices, **columns}
+    return {
+        "segments": columns,
+        "words": {"word": word_text, "start": word_start, "end": word_end},
+    }
+
+
+def transcription_document(
+    task: VideoTask,
+    transcription: Transcription,
+    segments: Iterable[TranscriptionSegment],
+    layout: TranscriptionLayout,
+    indices: Optional[List[int]] = None
+) -> dict:
+    document = {
+        "task_id": task.id,
+        "version": task.transcription_version,
+        "language": transcription.language,
+        "duration": transcription.duration,
+    }
+    if layout == TranscriptionLayout.COLUMNS:
+        document["layout"] = layout.value
+        document.update(columnar_payload(segments, indices))
+    else:
+        document["segments"] = rows_payload(segments, indices)
+    return document
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q=0."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+class TranscriptionEncoder:
+    """Encoded transcription documents, cached per task version.
+
+    Both the orjson body and each compressed form are kept, so repeated
+    loads of an unchanged transcription cost one dictionary lookup.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        settings = get_settings()
+        self.max_entries = max_entries or settings.transcription_response_cache_size
+        self.min_compress_bytes = settings.response_compression_min_bytes
+        self._cache: "OrderedDict[Tuple[str, int, str, Optional[str]], bytes]" = OrderedDict()
+
+    @staticmethod
+    def etag(
+        task: VideoTask,
+        layout: TranscriptionLayout,
+        encoding: Optional[str],
+        window: Optional[Tuple[float, float]] = None
+    ) -> str:
+        parts = [task.id, f"v{task.transcription_version}", layout.value]
+        if window:
+            parts.append(f"{window[0]:g}-{window[1]:g}")
+        if encoding:
+            parts.append(encoding)
+        return f'"{"-".join(parts)}"'
+
+    def _get(self, key) -> Optional[bytes]:
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+        return body
+
+    def _put(self, key, body: bytes):
+        self._cache[key] = body
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def encode(
+        self,
+        task: VideoTask,
+        layout: TranscriptionLayout,
+        accept_encoding: Optional[str] = None
+    ) -> EncodedTranscription:
+        transcription = task.transcription
+        version = task.transcription_version
+        plain_key = (task.id, version, layout.value, None)
+
+        plain = self._get(plain_key)
+        record_cache_lookup("transcription_response", hit=plain is not None)
+        if plain is None:
+            document = transcription_document(task, transcription, transcription.segments, layout)
+            plain = await asyncio.to_thread(orjson.dumps, document)
+            self._put(plain_key, plain)
+            logger.info("transcription_encoded", task_id=task.id, version=version, layout=layout.value, bytes=len(plain))
+
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None or len(plain) < self.min_compress_bytes:
+            return EncodedTranscription(body=plain, etag=self.etag(task, layout, None), encoding=None)
+
+        key = (task.id, version, layout.value, encoding)
+        body = self._get(key)
+        if body is None:
+            body = await asyncio.to_thread(compress, plain, encoding)
+            self._put(key, body)
+        return EncodedTranscription(body=body, etag=self.etag(task, layout, encoding), encoding=encoding)
+
+    def encode_window(
+        self,
+        task: VideoTask,
+        start: float,
+        end: float,
+        layout: TranscriptionLayout,
+        accept_encoding: Optional[str] = None
+    ) -> EncodedTranscription:
+        """Segments overlapping ``[start, end)``, each with only its overlapping words.
+
+        Segments carry their ``index`` in the full transcription so edits
+        can be sent with PATCH. Windows are small and rarely repeat, so the
+        result is not cached.
+        """
+        transcription = task.transcription
+        indices = get_transcription_index_cache().get(task).query(start, end)
+        segments = [
+            replace(
+                transcription.segments[i],
+                words=[w for w in transcription.segments[i].words if w["start"] < end and w["end"] > start]
+            )
+            for i in indices
+        ]
+        document = transcription_document(task, transcription, segments, layout, indices)
+        document["window"] = {"start": start, "end": None if math.isinf(end) else end}
+
+        body = orjson.dumps(document)
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None or len(body) < self.min_compress_bytes:
+            encoding = None
+        return EncodedTranscription(
+            body=compress(body, encoding),
+            etag=self.etag(task, layout, encoding, (start, end)),
+            encoding=encoding
+        )
+
+
+_transcription_encoder: Optional[TranscriptionEncoder] = None
+
+
+def get_transcription_encoder() -> TranscriptionEncoder:
+    global _transcription_encoder
+    if _transcription_encoder is None:
+        _transcription_encoder = TranscriptionEncoder()
+    return _transcription_encoder
@@ -0,0 +1,182 @@
+from dataclasses import replace
+from typing import List, Sequence, Tuple
+
+from app.models import Transcription, TranscriptionSegment
+from app.schemas import (
+    MergeOperation,
+    OffsetOperation,
+    ReplaceTextOperation,
+    RetimeOperation,
+    ShiftOperation,
+    SplitOperation,
+)
+from app.core.exceptions import TranscriptionEditError
+
+
+def _copy_segment(segment: TranscriptionSegment) -> TranscriptionSegment:
+    return replace(segment, words=[dict(word) for word in segment.words])
+
+
+def _move(segment: TranscriptionSegment, delta: float) -> TranscriptionSegment:
+    return TranscriptionSegment(
+        start=segment.start + delta,
+        end=segment.end + delta,
+        text=segment.text,
+        words=[
+            {**word, "start": word["start"] + delta, "end": word["end"] + delta}
+            for word in segment.words
+        ],
+    )
+
+
+def _retimed_words(segment: TranscriptionSegment, start: float, end: float) -> List[dict]:
+    """Scale word timings from the segment's span onto ``[start, end]``."""
+    span = segment.end - segment.start
+    scale = (end - start) / span if span > 0 else 0.0
+    return [
+        {
+            **word,
+            "start": start + (word["start"] - segment.start) * scale,
+            "end": start + (word["end"] - segment.start) * scale,
+        }
+        for word in segment.words
+    ]
+
+
+def _words_for_text(segment: TranscriptionSegment, text: str) -> List[dict]:
+    """Word timings for replaced text, reusing the old ones where possible.
+
+    An equal word count keeps every timing; otherwise the new words share
+    the old words' span by character length.
+    """
+    tokens = text.split()
+    if not segment.words or not tokens:
+        return []
+    if len(tokens) == len(segment.words):
+        return [{**word, "word": token} for word, token in zip(segment.words, tokens)]
+
+    start, end = segment.words[0]["start"], segment.words[-1]["end"]
+    total_chars = sum(len(token) for token in tokens)
+    words, current = [], start
+    for token in tokens:
+        word_end = current + (end - start) * len(token) / total_chars
+        words.append({"word": token, "start": current, "end": word_end})
+        current = word_end
+    return words
+
+
+def apply_operations(
+    transcription: Transcription,
+    operations: Sequence
+) -> Tuple[Transcription, List[Tuple[float, float]]]:
+    """Apply edit operations in order to a copy of ``transcription``.
+
+    Returns the edited transcription and the merged time intervals whose
+    captions changed (old and new spans). The input is left untouched, so
+    tasks rendered from it keep their snapshot.
+    """
+    segments = [_copy_segment(segment) for segment in transcription.segments]
+    touched: List[Tuple[float, float]] = []
+
+    def _segment(index: int, label: str) -> TranscriptionSegment:
+        if index >= len(segments):
+            raise TranscriptionEditError(
+                f"{label}: segment {index} does not exist",
+                {"segments": len(segments)}
+            )
+        return segments[index]
+
+    for position, op in enumerate(operations):
+        label = f"operation {position} ({op.op})"
+
+        if isinstance(op, ReplaceTextOperation):
+            segment = _segment(op.index, label)
+            if op.words is not None:
+                words = [word.model_dump() for word in op.words]
+            else:
+                words = _words_for_text(segment, op.text)
+            segments[op.index] = replace(segment, text=op.text, words=words)
+            touched.append((segment.start, segment.end))
+
+        elif isinstance(op, ShiftOperation):
+            _segment(op.index + op.count - 1, label)
+            for index in range(op.index, op.index + op.count):
+                segment = segments[index]
+                if segment.start + op.delta < 0:
+                    raise TranscriptionEditError(f"{label}: segment {index} would start before 0")
+                segments[index] = _move(segment, op.delta)
+                touched += [(segment.start, segment.end), (segments[index].start, segments[index].end)]
+
+        elif isinstance(op, RetimeOperation):
+            segment = _segment(op.index, label)
+            segments[op.index] = replace(
+                segment,
+                start=op.start,
+                end=op.end,
+                words=_retimed_words(segment, op.start, op.end)
+            )
+            touched += [(segment.start, segment.end), (op.start, op.end)]
+
+        elif isinstance(op, SplitOperation):
+            segment = _segment(op.index, label)
+            if not segment.start < op.at < segment.end:
+                raise TranscriptionEditError(
+                    f"{label}: split time must fall inside segment {op.index}",
+                    {"start": segment.start, "end": segment.end}
+                )
+            head_words = [word for word in segment.words if word["start"] < op.at]
+            tail_words = [word for word in segment.words if word["start"] >= op.at]
+            if segment.words:
+                head_text = " ".join(word["word"] for word in head_words)
+                tail_text = " ".join(word["word"] for word in tail_words)
+            else:
+                # No word timings: split the text proportionally to time.
+                tokens = segment.text.split()
+                cut = round(len(tokens) * (op.at - segment.start) / (segment.end - segment.start))
+                head_text, tail_text = " ".join(tokens[:cut]), " ".join(tokens[cut:])
+            if not head_text or not tail_text:
+                raise TranscriptionEditError(f"{label}: split would leave an empty segment")
+            segments[op.index:op.index + 1] = [
+                TranscriptionSegment(start=segment.start, end=op.at, text=head_text, words=head_words),
+                TranscriptionSegment(start=op.at, end=segment.end, text=tail_text, words=tail_words),
+            ]
+            touched.append((segment.start, segment.end))
+
+        elif isinstance(op, MergeOperation):
+            first = _segment(op.index, label)
+            second = _segment(op.index + 1, label)
+            segments[op.index:op.index + 2] = [
+                TranscriptionSegment(
+                    start=min(first.start, second.start),
+                    end=max(first.end, second.end),
+                    text=f"{first.text.strip()} {second.text.strip()}".strip(),
+                    words=first.words + second.words,
+                )
+            ]
+            touched.append((min(first.start, second.start), max(first.end, second.end)))
+
+        elif isinstance(op, OffsetOperation) and segments:
+            first = min(segment.start for segment in segments)
+            last = max(segment.end for segment in segments)
+            if first + op.delta < 0:
+                raise TranscriptionEditError(f"{label}: transcription would start before 0")
+            segments = [_move(segment, op.delta) for segment in segments]
+            touched += [(first, last), (first + op.delta, last + op.delta)]
+
+    edited = Transcription(
+        segments=segments,
+        language=transcription.language,
+        duration=max([transcription.duration, *(segment.end for segment in segments)]),
+        metrics=transcription.metrics,
+    )
+    return edited, merge_intervals(touched)
+
+
+def merge_intervals(intervals: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    merged: List[Tuple[float, float]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,62 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import accumulate
+from typing import List, Optional
+
+from app.models import Transcription, VideoTask
+from app.core.config import get_settings
+from app.core.metrics import record_cache_lookup
+
+
+class TranscriptionIndex:
+    """Segments of one transcription version sorted for time-window lookups.
+
+    ``starts`` is sorted, and ``max_ends[i]`` is the latest end among the
+    first ``i + 1`` segments in that order. Everything that can overlap a
+    window therefore lies in one contiguous slice found by two bisections.
+    """
+
+    def __init__(self, transcription: Transcription):
+        segments = transcription.segments
+        self.order = sorted(range(len(segments)), key=lambda i: segments[i].start)
+        self.starts = [segments[i].start for i in self.order]
+        self.ends = [segments[i].end for i in self.order]
+        self.max_ends = list(accumulate(self.ends, max))
+
+    def query(self, start: float, end: float) -> List[int]:
+        """Indices of segments overlapping ``[start, end)``, in time order."""
+        lo = bisect_right(self.max_ends, start)
+        hi = bisect_left(self.starts, end)
+        # Only segments nested inside a longer earlier one can fail the end check.
+        return [self.order[i] for i in range(lo, hi) if self.ends[i] > start]
+
+
+class TranscriptionIndexCache:
+    """One index per (task, transcription version), built on first query."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or get_settings().transcription_response_cache_size
+        self._entries: "OrderedDict[tuple[str, int], TranscriptionIndex]" = OrderedDict()
+
+    def get(self, task: VideoTask) -> TranscriptionIndex:
+        key = (task.id, task.transcription_version)
+        index = self._entries.get(key)
+        record_cache_lookup("transcription_index", hit=index is not None)
+        if index is None:
+            index = TranscriptionIndex(task.transcription)
+            self._entries[key] = index
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return index
+
+
+_transcription_index_cache: Optional[TranscriptionIndexCache] = None
+
+
+def get_transcription_index_cache() -> TranscriptionIndexCache:
+    global _transcription_index_cache
+    if _transcription_index_cache is None:
+        _transcription_index_cache = TranscriptionIndexCache()
+    return _transcription_index_cache
@@ -0,0 +1,169 @@
+import asyncio
+import bisect
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.exceptions import TranscriptionError
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class SpeechRegion:
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class SpeechTimeline:
+    """Maps timestamps on the compacted speech-only audio back to the source timeline."""
+
+    def __init__(self, regions: List[SpeechRegion], gap: float = 0.0):
+        self.regions = regions
+        self.gap = gap
+        self._compact_starts: List[float] = []
+        offset = 0.0
+        for region in regions:
+            self._compact_starts.append(offset)
+            offset += region.duration + gap
+        self.compact_duration = max(offset - gap, 0.0)
+
+    def to_source(self, t: float) -> float:
+        if not self.regions:
+            return t
+        idx = max(bisect.bisect_right(self._compact_starts, t) - 1, 0)
+        region = self.regions[idx]
+        local = min(max(t - self._compact_starts[idx], 0.0), region.duration)
+        return round(region.start + local, 3)
+
+
+class VoiceActivityDetector:
+    """Energy-based VAD over 16 kHz mono PCM, runs on CPU with no model download."""
+
+    def __init__(
+        self,
+        frame_ms: Optional[int] = None,
+        threshold_db: Optional[float] = None,
+        min_speech_ms: Optional[int] = None,
+        min_silence_ms: Optional[int] = None,
+        padding_ms: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self.frame_ms = frame_ms or settings.vad_frame_ms
+        self.threshold_db = threshold_db if threshold_db is not None else settings.vad_threshold_db
+        self.min_speech_ms = min_speech_ms if min_speech_ms is not None else settings.vad_min_speech_ms
+        self.min_silence_ms = min_silence_ms if min_silence_ms is not None else settings.vad_min_silence_ms
+        self.padding_ms = padding_ms if padding_ms is not None else settings.vad_padding_ms
+
+    @staticmethod
+    def load_audio(audio_path: Path) -> np.ndarray:
+        with wave.open(str(audio_path), "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1 or wav.getframerate() != SAMPLE_RATE:
+                raise TranscriptionError(
+                    "VAD expects 16 kHz mono 16-bit PCM audio",
+                    details={"path": str(audio_path)}
+                )
+            frames = wav.readframes(wav.getnframes())
+        return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def detect(self, audio: np.ndarray) -> List[SpeechRegion]:
+        frame_len = int(SAMPLE_RATE * self.frame_ms / 1000)
+        n_frames = len(audio) // frame_len
+        if n_frames == 0:
+            return []
+
+        frames = audio[: n_frames * frame_len].reshape(n_frames, frame_len)
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+
+        # Adaptive threshold: a fixed margin above the estimated noise floor,
+        # but never below an absolute floor so pure digital silence stays silent.
+        noise_floor = float(np.percentile(energy_db, 10))
+        threshold = max(noise_floor + self.threshold_db, -60.0)
+        voiced = energy_db > threshold
+
+        regions: List[Tuple[int, int]] = []
+        start = None
+        for i, is_voiced in enumerate(voiced):
+            if is_voiced and start is None:
+                start = i
+            elif not is_voiced and start is not None:
+                regions.append((start, i))
+                start = None
+        if start is not None:
+            regions.append((start, n_frames))
+
+        min_silence = self.min_silence_ms / self.frame_ms
+        merged: List[List[int]] = []
+        for s, e in regions:
+            if merged and s - merged[-1][1] < min_silence:
+                merged[-1][1] = e
+            else:
+                merged.append([s, e])
+
+        min_speech = self.min_speech_ms / self.frame_ms
+        pad = self.padding_ms / 1000
+        total = len(audio) / SAMPLE_RATE
+        speech: List[SpeechRegion] = []
+        for s, e in merged:
+            if e - s < min_speech:
+                continue
+            start_t = max(s * self.frame_ms / 1000 - pad, 0.0)
+            end_t = min(e * self.frame_ms / 1000 + pad, total)
+            if speech and start_t <= speech[-1].end:
+                speech[-1].end = end_t
+            else:
+                speech.append(SpeechRegion(start=start_t, end=end_t))
+        return speech
+
+    @staticmethod
+    def compact(
+        audio: np.ndarray,
+        regions: List[SpeechRegion],
+        gap: float = 0.0
+    ) -> Tuple[np.ndarray, SpeechTimeline]:
+        gap_samples = np.zeros(int(gap * SAMPLE_RATE), dtype=np.float32)
+        pieces = []
+        for region in regions:
+            pieces.append(audio[int(region.start * SAMPLE_RATE):int(region.end * SAMPLE_RATE)])
+            pieces.append(gap_samples)
+        if pieces:
+            pieces.pop()
+        compacted = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+        return compacted, SpeechTimeline(regions, gap=gap)
+
+    async def detect_file(self, audio_path: Path) -> Tuple[np.ndarray, List[SpeechRegion]]:
+        def _run():
+            audio = self.load_audio(audio_path)
+            return audio, self.detect(audio)
+
+        audio, regions = await asyncio.to_thread(_run)
+        speech_seconds = sum(r.duration for r in regions)
+        logger.info(
+            "vad_completed",
+            audio_path=str(audio_path),
+            regions=len(regions),
+            speech_seconds=round(speech_seconds, 2),
+            total_seconds=round(len(audio) / SAMPLE_RATE, 2)
+        )
+        return audio, regions
+
+
+_vad: Optional[VoiceActivityDetector] = None
+
+
+def get_voice_activity_detector() -> VoiceActivityDetector:
+    global _vad
+    if _vad is None:
+        _vad = VoiceActivityDetector()
+    return _vad
@@ -2,150 +2,264 @@ import ffmpeg
 import subprocess
 import json
 import asyncio
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Awaitable, Callable, Deque, Dict, Optional, List, Tuple
 from app.models import Transcription, TranscriptionSegment
-from app.schemas import CaptionConfig, CaptionStyle, CaptionPosition, FontWeight
+from app.schemas import CaptionConfig, OutputPreset, RenderProfile, RenderVariant
+from app.services.subtitles import (
+    AssSubtitleWriter,
+    CaptionLine,
+    build_caption_lines,
+    render_srt,
+    render_webvtt,
+    shift_caption_lines,
+)
+from app.services.media_probe import get_media_probe_cache
+from app.services.incremental_render import EPSILON, RenderRange, changed_intervals, plan_ranges
 from app.core.logging import get_logger
 from app.core.exceptions import VideoProcessingError
 from app.core.config import get_settings
+from app.core.metrics import observe_stage
 
 logger = get_logger(__name__)
 
 
-class CaptionStyler:
-    STYLE_PRESETS = {
-        CaptionStyle.TIKTOK: {
-            "font": "Arial",
-            "font_size": 52,
-            "font_color": "#FFFFFF",
-            "stroke_color": "#000000",
-            "stroke_width": 4,
-            "background_color": None,
-            "highlight_color": "#00FF00",
-            "shadow": True,
-        },
-        CaptionStyle.INSTAGRAM: {
-            "font": "Helvetica",
-            "font_size": 48,
-            "font_color": "#FFFFFF",
-            "stroke_color": "#000000",
-            "stroke_width": 3,
-            "background_color": "#000000",
-            "background_opacity": 0.5,
-            "highlight_color": "#FF6B6B",
-            "shadow": False,
-        },
-        CaptionStyle.YOUTUBE_SHORTS: {
-            "font": "Impact",
-            "font_size": 56,
-            "font_color": "#FFFFFF",
-            "stroke_color": "#000000",
-            "stroke_width": 5,
-            "background_color": None,
-            "highlight_color": "#FFD700",
-            "shadow": True,
-        },
-        CaptionStyle.MINIMAL: {
-            "font": "Arial",
-            "font_size": 36,
-            "font_color": "#FFFFFF",
-            "stroke_color": "#333333",
-            "stroke_width": 1,
-            "background_color": None,
-            "highlight_color": "#FFFFFF",
-            "shadow": False,
-        },
-        CaptionStyle.BOLD: {
-            "font": "Impact",
-            "font_size": 64,
-            "font_color": "#FFFF00",
-            "stroke_color": "#000000",
-            "stroke_width": 6,
-            "background_color": None,
-            "highlight_color": "#FF0000",
-            "shadow": True,
-        },
-        CaptionStyle.NEON: {
-            "font": "Arial",
-            "font_size": 48,
-            "font_color": "#00FFFF",
-            "stroke_color": "#FF00FF",
-            "stroke_width": 3,
-            "background_color": None,
-            "highlight_color": "#00FF00",
-            "shadow": True,
-        },
+def _parse_progress(block: dict) -> dict:
+    # out_time_ms is misnamed (microseconds) in older ffmpeg; prefer out_time_us.
+    raw = block.get("out_time_us") or block.get("out_time_ms")
+    try:
+        out_time = max(int(raw), 0) / 1_000_000
+    except (TypeError, ValueError):
+        out_time = 0.0
+
+    def _float(value: Optional[str]) -> Optional[float]:
+        try:
+            return float(value.rstrip("x"))
+        except (AttributeError, ValueError):
+            return None
+
+    return {
+        "out_time": out_time,
+        "fps": _float(block.get("fps")),
+        "speed": _float(block.get("speed")),
+        "done": block.get("progress") == "end",
     }
-    
-    @classmethod
-    def get_style(cls, config: CaptionConfig) -> dict:
-        preset = cls.STYLE_PRESETS.get(config.style, cls.STYLE_PRESETS[CaptionStyle.TIKTOK]).copy()
-        
-        if config.font_size:
-            preset["font_size"] = config.font_size
-        if config.font_color:
-            preset["font_color"] = config.font_color
-        if config.stroke_color:
-            preset["stroke_color"] = config.stroke_color
-        if config.stroke_width is not None:
-            preset["stroke_width"] = config.stroke_width
-        if config.background_color:
-            preset["background_color"] = config.background_color
-        if config.highlight_color:
-            preset["highlight_color"] = config.highlight_color
-            
-        return preset
+
+
+def _even(value: float) -> int:
+    return max(2, int(round(value / 2)) * 2)
+
+
+def _crop_to_aspect(width: int, height: int, aspect: float) -> Tuple[int, int]:
+    """Largest centered rectangle of ``aspect`` that fits in ``width`` x ``height``."""
+    if abs(width / height - aspect) < 1e-3:
+        return width, height
+    if width / height > aspect:
+        return _even(height * aspect), height
+    return width, _even(width / aspect)
+
+
+# Scheduling priority for ffmpeg processes started from the current context.
+_ffmpeg_niceness: ContextVar[int] = ContextVar("ffmpeg_niceness", default=0)
+
+
+@contextmanager
+def ffmpeg_priority(niceness: int):
+    """Run ffmpeg processes started inside this block at ``niceness`` (0-19)."""
+    token = _ffmpeg_niceness.set(niceness)
+    try:
+        yield
+    finally:
+        _ffmpeg_niceness.reset(token)
+
+
+class RenderProgress:
+    """Aggregates ffmpeg progress from one or more concurrent encodes.
+
+    Updates arrive on worker threads; they are rate-limited and handed to an
+    async ``callback(fraction, stats)`` on the event loop.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[float, dict], Awaitable[None]]],
+        duration: float,
+        min_interval: Optional[float] = None
+    ):
+        self.callback = callback
+        self.duration = max(duration, 1e-6)
+        self.min_interval = min_interval if min_interval is not None else get_settings().render_progress_interval
+        self._loop = asyncio.get_running_loop()
+        self._lock = threading.Lock()
+        self._done: Dict[str, float] = {}
+        self._last_sent = 0.0
+        self._started = time.monotonic()
+
+    def reporter(self, key: str = "main") -> Optional[Callable[[dict], None]]:
+        if self.callback is None:
+            return None
+
+        def _report(progress: dict):
+            self.update(key, progress)
+        return _report
+
+    def update(self, key: str, progress: dict):
+        with self._lock:
+            self._done[key] = progress["out_time"]
+            now = time.monotonic()
+            if now - self._last_sent < self.min_interval and not progress["done"]:
+                return
+            self._last_sent = now
+            processed = sum(self._done.values())
+
+        fraction = min(processed / self.duration, 1.0)
+        elapsed = now - self._started
+        eta = elapsed * (1 - fraction) / fraction if fraction > 0 else None
+        stats = {
+            "processed_seconds": round(processed, 2),
+            "duration": round(self.duration, 2),
+            "fps": progress["fps"],
+            "speed": progress["speed"],
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+        asyncio.run_coroutine_threadsafe(self.callback(fraction, stats), self._loop)
 
 
 class VideoProcessor:
+    # Target (width, height, fps) for platform output presets.
+    OUTPUT_PRESETS = {
+        OutputPreset.TIKTOK: (1080, 1920, 30),
+        OutputPreset.REELS: (1080, 1920, 30),
+        OutputPreset.SHORTS: (1080, 1920, 30),
+        OutputPreset.SQUARE: (1080, 1080, 30),
+    }
+
+    # Subtitle track written for soft captions, keyed by output container:
+    # (sidecar format, subtitle codec). Containers not listed are remuxed to MKV.
+    SOFT_SUBTITLE_FORMATS = {
+        ".mp4": ("srt", "mov_text"),
+        ".m4v": ("srt", "mov_text"),
+        ".mov": ("srt", "mov_text"),
+        ".mkv": ("ass", "ass"),
+        ".webm": ("vtt", "webvtt"),
+    }
+
     def __init__(self):
         self.settings = get_settings()
     
-    async def extract_audio(self, video_path: Path, output_path: Path) -> Path:
+    @staticmethod
+    def default_thumbnail_time(duration: float) -> float:
+        # 1 second in, or 10% in for clips shorter than 10 seconds
+        return min(1.0, duration * 0.1)
+
+    async def ingest(
+        self,
+        video_path: Path,
+        audio_path: Optional[Path],
+        thumbnail_path: Path,
+        storyboard_path: Optional[Path] = None,
+        proxy_path: Optional[Path] = None,
+        clip_start: Optional[float] = None,
+        clip_end: Optional[float] = None
+    ) -> dict:
+        """Produce every ingest artifact from one read of the source.
+
+        The 16 kHz mono WAV for transcription only demuxes the audio stream.
+        The poster frame stops the video decoder once written, unless a
+        storyboard or proxy asks for the whole video. Pass ``audio_path=None``
+        for inputs without audio. ``clip_start``/``clip_end`` restrict every
+        artifact to that range of the source.
+        """
+        media_info = await get_media_probe_cache().probe(video_path)
+        logger.info(
+            "ingesting_video",
+            video_path=str(video_path),
+            has_audio=audio_path is not None,
+            clip_start=clip_start,
+            clip_end=clip_end
+        )
+
+        clip_start = clip_start or 0.0
+        clip_end = clip_end if clip_end is not None else media_info.duration
+        duration = clip_end - clip_start
+
+        cmd = ["ffmpeg"]
+        if clip_start:
+            cmd += ["-ss", f"{clip_start:.3f}"]
+        if clip_end < media_info.duration:
+            cmd += ["-t", f"{duration:.3f}"]
+        cmd += ["-i", str(video_path)]
+        artifacts: Dict[str, Path] = {}
+        if audio_path is not None:
+            cmd += [
+                "-map", "0:a:0",
+                "-ac", "1",
+                "-ar", "16000",
+                "-c:a", "pcm_s16le",
+                "-y", str(audio_path)
+            ]
+            artifacts["audio"] = audio_path
+
+        cmd += [
+            "-map", "0:v:0",
+            "-ss", f"{self.default_thumbnail_time(duration):.3f}",
+            "-frames:v", "1",
+            "-y", str(thumbnail_path)
+        ]
+        artifacts["thumbnail"] = thumbnail_path
+
+        if storyboard_path is not None:
+            columns, rows = self.settings.storyboard_columns, self.settings.storyboard_rows
+            interval = max(duration / (columns * rows), 0.1)
+            cmd += [
+                "-map", "0:v:0",
+                "-vf", f"fps=1/{interval:.3f},scale={self.settings.storyboard_tile_width}:-2,tile={columns}x{rows}",
+                "-frames:v", "1",
+                "-y", str(storyboard_path)
+            ]
+            artifacts["storyboard"] = storyboard_path
+
+        if proxy_path is not None:
+            cmd += [
+                "-map", "0:v:0",
+                "-map", "0:a?",
+                "-vf", f"scale=-2:{min(self.settings.ingest_proxy_height, media_info.height)}",
+                *self._encoder_args(RenderProfile.PREVIEW),
+                "-c:a", "aac",
+                "-b:a", "96k",
+                "-movflags", "+faststart",
+                "-y", str(proxy_path)
+            ]
+            artifacts["proxy"] = proxy_path
+
         try:
-            logger.info("extracting_audio", video_path=str(video_path))
-            
-            def _run_ffmpeg():
-                (
-                    ffmpeg
-                    .input(str(video_path))
-                    .output(str(output_path), acodec='pcm_s16le', ac=1, ar='16000')
-                    .overwrite_output()
-                    .run(capture_stdout=True, capture_stderr=True)
-                )
+            await self._run_ffmpeg(cmd, stage="ingest")
+        except VideoProcessingError as e:
+            logger.error("ingest_failed", error=str(e), video_path=str(video_path))
+            raise VideoProcessingError(f"Failed to ingest video: {str(e)}")
+
+        missing = [name for name, path in artifacts.items() if not path.exists()]
+        if missing:
+            raise VideoProcessingError(f"Ingest did not produce: {', '.join(missing)}")
+
+        logger.info("video_ingested", video_path=str(video_path), artifacts=sorted(artifacts))
+        return artifacts
 
-            await asyncio.to_thread(_run_ffmpeg)
-            
-            logger.info("audio_extracted", output_path=str(output_path))
-            return output_path
-            
-        except ffmpeg.Error as e:
-            logger.error("audio_extraction_failed", error=e.stderr.decode() if e.stderr else str(e))
-            raise VideoProcessingError(f"Failed to extract audio: {str(e)}")
-    
     async def get_video_info(self, video_path: Path) -> dict:
         try:
-            probe = ffmpeg.probe(str(video_path))
-            video_stream = next(
-                (s for s in probe['streams'] if s['codec_type'] == 'video'),
-                None
-            )
-            
-            if not video_stream:
-                raise VideoProcessingError("No video stream found")
-            
-            return {
-                "width": int(video_stream['width']),
-                "height": int(video_stream['height']),
-                "duration": float(probe['format'].get('duration', 0)),
-                "fps": eval(video_stream.get('r_frame_rate', '30/1')),
-            }
+            info = await get_media_probe_cache().probe(video_path)
+            return info.as_video_info()
         except Exception as e:
             logger.error("video_probe_failed", error=str(e))
             raise VideoProcessingError(f"Failed to probe video: {str(e)}")
-    
-    
+
     async def generate_thumbnail(self, video_path: Path, output_path: Path, time: float = 0.0) -> Path:
         try:
             logger.info("generating_thumbnail", video_path=str(video_path))
@@ -159,7 +273,8 @@ class VideoProcessor:
                     .run(capture_stdout=True, capture_stderr=True)
                 )
 
-            await asyncio.to_thread(_run_ffmpeg)
+            with observe_stage("thumbnail"):
+                await asyncio.to_thread(_run_ffmpeg)
             
             if not output_path.exists():
                 raise VideoProcessingError("Thumbnail file was not created")
@@ -174,286 +289,375 @@ class VideoProcessor:
             logger.error("thumbnail_generation_failed", error=str(e))
             raise VideoProcessingError(f"Failed to generate thumbnail: {str(e)}")
 
-    def _generate_ass_subtitle(
+    @staticmethod
+    async def _write_ass(writer: AssSubtitleWriter, lines: List[CaptionLine], ass_path: Path) -> Path:
+        with observe_stage("ass_generation"):
+            return await asyncio.to_thread(writer.write, lines, ass_path)
+    
+    def _encoder_args(self, render_profile: RenderProfile = RenderProfile.FINAL) -> List[str]:
+        if render_profile == RenderProfile.PREVIEW:
+            return [
+                "-c:v", "libx264",
+                "-preset", self.settings.preview_preset,
+                "-crf", str(self.settings.preview_crf),
+                "-pix_fmt", "yuv420p",
+            ]
+
+        args = [
+            "-c:v", "libx264",
+            "-profile:v", "high",
+            "-level", "4.0",
+            "-preset", self.settings.render_preset,
+            "-crf", str(self.settings.render_crf),
+            "-pix_fmt", "yuv420p",
+        ]
+        if self.settings.render_threads:
+            args += ["-threads", str(self.settings.render_threads)]
+        return args
+
+    def _profile_filters(self, video_info: dict, render_profile: RenderProfile) -> List[str]:
+        """Filters applied before the caption overlay.
+
+        Preview renders are downscaled and frame-rate capped. The ASS script
+        keeps the source PlayRes, so libass scales the captions with the frame.
+        """
+        if render_profile != RenderProfile.PREVIEW:
+            return []
+
+        filters = []
+        if video_info["height"] > self.settings.preview_max_height:
+            filters.append(f"scale=-2:{self.settings.preview_max_height}")
+        if video_info["fps"] > self.settings.preview_max_fps:
+            filters.append(f"fps={self.settings.preview_max_fps}")
+        return filters
+
+    @staticmethod
+    def _variant_geometry(
+        video_info: dict,
+        width: Optional[int],
+        height: Optional[int],
+        crop: bool = False
+    ) -> Tuple[List[str], int, int]:
+        """Scale/crop filters for an output size, plus the ASS PlayRes to use.
+
+        PlayRes is the visible source rectangle, so captions keep their size
+        relative to the source picture and libass scales them uniformly.
+        """
+        src_w, src_h = video_info["width"], video_info["height"]
+        if not width and not height:
+            return [], src_w, src_h
+
+        if crop:
+            crop_w, crop_h = _crop_to_aspect(src_w, src_h, width / height)
+            filters = [f"crop={crop_w}:{crop_h}", f"scale={width}:{height}", "setsar=1"]
+            return filters, crop_w, crop_h
+
+        factor = min(width / src_w if width else float("inf"), height / src_h if height else float("inf"))
+        filters = [f"scale={_even(src_w * factor)}:{_even(src_h * factor)}", "setsar=1"]
+        return filters, src_w, src_h
+
+    def _preset_geometry(
         self,
-        transcription: Transcription,
+        video_info: dict,
+        preset: OutputPreset,
+        render_profile: RenderProfile = RenderProfile.FINAL
+    ) -> Tuple[List[str], int, int]:
+        """Frame-rate, crop and scale filters for a platform preset.
+
+        Frames are dropped first so the rest of the graph only sees what is
+        kept. PlayRes is the preset's target size, so caption layout is
+        computed for the platform resolution rather than the source.
+        """
+        width, height, fps = self.OUTPUT_PRESETS[preset]
+        play_w, play_h = width, height
+        if render_profile == RenderProfile.PREVIEW:
+            fps = min(fps, self.settings.preview_max_fps)
+            if height > self.settings.preview_max_height:
+                factor = self.settings.preview_max_height / height
+                width, height = _even(width * factor), _even(height * factor)
+
+        filters = []
+        if video_info["fps"] > fps:
+            filters.append(f"fps={fps}")
+        crop_w, crop_h = _crop_to_aspect(video_info["width"], video_info["height"], play_w / play_h)
+        if (crop_w, crop_h) != (video_info["width"], video_info["height"]):
+            filters.append(f"crop={crop_w}:{crop_h}")
+        filters += [f"scale={width}:{height}", "setsar=1"]
+        return filters, play_w, play_h
+
+    @staticmethod
+    def _ass_filter(ass_path: Path) -> str:
+        ass_path_escaped = str(ass_path).replace("\\", "/").replace(":", "\\:")
+        return f"ass='{ass_path_escaped}'"
+
+    async def _run_ffmpeg(
+        self,
+        cmd: List[str],
+        on_progress: Optional[Callable[[dict], None]] = None,
+        stage: str = "encode"
+    ) -> None:
+        """Run ffmpeg, streaming ``-progress`` blocks to ``on_progress``.
+
+        ``on_progress`` is called from the worker thread. Only the last
+        ``ffmpeg_stderr_lines`` lines of stderr are kept for error reporting.
+        Cancelling the awaiting task kills the ffmpeg process. The run is
+        timed under the ``stage`` metrics label.
+        """
+        cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+        stderr_tail: Deque[str] = deque(maxlen=self.settings.ffmpeg_stderr_lines)
+        processes: List[subprocess.Popen] = []
+
+        def _drain_stderr(stream):
+            for line in stream:
+                stderr_tail.append(line.rstrip())
+
+        cmd, popen_kwargs = self._with_priority(cmd)
+
+        def _run_ffmpeg_cmd():
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                **popen_kwargs
+            )
+            processes.append(process)
+            stderr_thread = threading.Thread(target=_drain_stderr, args=(process.stderr,), daemon=True)
+            stderr_thread.start()
+
+            block = {}
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                block[key] = value
+                if key == "progress":
+                    if on_progress:
+                        on_progress(_parse_progress(block))
+                    block = {}
+
+            returncode = process.wait()
+            stderr_thread.join()
+            return returncode
+
+        with observe_stage(stage):
+            try:
+                returncode = await asyncio.to_thread(_run_ffmpeg_cmd)
+            except asyncio.CancelledError:
+                for process in processes:
+                    if process.poll() is None:
+                        process.kill()
+                raise
+
+            if returncode != 0:
+                stderr = "\n".join(stderr_tail)
+                logger.error(
+                    "ffmpeg_failed",
+                    returncode=returncode,
+                    stderr=stderr
+                )
+                raise VideoProcessingError(f"FFmpeg failed: {stderr}")
+
+    @staticmethod
+    def _with_priority(cmd: List[str]) -> Tuple[List[str], dict]:
+        """Apply the ``ffmpeg_priority`` niceness to ``cmd`` and its Popen kwargs.
+
+        On POSIX the command is wrapped in ``nice``; ``preexec_fn`` is not
+        safe to use here because ffmpeg is started from worker threads.
+        """
+        niceness = _ffmpeg_niceness.get()
+        if not niceness:
+            return cmd, {}
+        if os.name == "nt":
+            priority = subprocess.IDLE_PRIORITY_CLASS if niceness >= 10 else subprocess.BELOW_NORMAL_PRIORITY_CLASS
+            return cmd, {"creationflags": priority}
+        return ["nice", "-n", str(niceness), *cmd], {}
+
+    async def get_keyframe_times(self, video_path: Path) -> List[float]:
+        return await get_media_probe_cache().keyframes(video_path)
+
+    async def _encode_range(
+        self,
+        video_path: Path,
+        output_path: Path,
+        lines: List[CaptionLine],
         config: CaptionConfig,
-        video_width: int,
-        video_height: int
-    ) -> str:
-        style = CaptionStyler.get_style(config)
-        
-        font_color = style["font_color"].lstrip("#")
-        font_color_ass = f"&H00{font_color[4:6]}{font_color[2:4]}{font_color[0:2]}"
-        
-        stroke_color = style["stroke_color"].lstrip("#")
-        stroke_color_ass = f"&H00{stroke_color[4:6]}{stroke_color[2:4]}{stroke_color[0:2]}"
-        
-        highlight_color = style["highlight_color"].lstrip("#")
-        highlight_color_ass = f"&H00{highlight_color[4:6]}{highlight_color[2:4]}{highlight_color[0:2]}"
-        
-        margin_v = 50
-        if config.position == CaptionPosition.TOP:
-            alignment = 8
-            margin_v = 50
-        elif config.position == CaptionPosition.CENTER:
-            alignment = 5
-            margin_v = 0
+        video_info: dict,
+        start: float,
+        end: Optional[float] = None,
+        threads: Optional[int] = None,
+        on_progress: Optional[Callable[[dict], None]] = None
+    ) -> Path:
+        """Encode the video stream of ``[start, end)`` with captions, timestamps rebased to zero."""
+        ass_path = output_path.with_suffix(".ass")
+        writer = AssSubtitleWriter(config, video_info["width"], video_info["height"])
+        window_end = end if end is not None else float("inf")
+        await self._write_ass(writer, shift_caption_lines(lines, start, window_end), ass_path)
+
+        # Nudge cut points back by a millisecond so frames sitting exactly on a
+        # keyframe timestamp land in the range that starts there.
+        cmd = ["ffmpeg", "-ss", f"{max(start - EPSILON, 0.0):.6f}", "-i", str(video_path)]
+        if end is not None:
+            cmd += ["-t", f"{end - max(start - EPSILON, 0.0) - EPSILON:.6f}"]
+        cmd += [
+            "-map", "0:v:0",
+            "-vf", self._ass_filter(ass_path),
+            *self._encoder_args(),
+            *(["-threads", str(threads)] if threads else []),
+            "-an",
+            "-y",
+            str(output_path)
+        ]
+        try:
+            await self._run_ffmpeg(cmd, on_progress)
+        finally:
+            if ass_path.exists():
+                ass_path.unlink()
+        return output_path
+
+    async def _split_at_keyframes(
+        self,
+        video_path: Path,
+        times: List[float],
+        work_dir: Path,
+        frame_duration: float
+    ) -> List[Path]:
+        """Stream-copy the video stream into pieces cut at the given keyframe times.
+
+        The segment muxer cuts at the first keyframe at or after each
+        requested time. Keyframe times are rounded, and a time that lands just
+        past the real PTS would move the cut to the following keyframe, so
+        cuts are requested half a frame early.
+        """
+        pattern = work_dir / "prev_%04d.mp4"
+        cmd = ["ffmpeg", "-i", str(video_path), "-map", "0:v:0", "-c", "copy", "-f", "segment"]
+        if times:
+            cmd += ["-segment_times", ",".join(f"{t - frame_duration / 2:.6f}" for t in times)]
         else:
-            alignment = 2
-            margin_v = 80
-        
-        bold = 1 if config.font_weight in [FontWeight.BOLD, FontWeight.BLACK] else 0
-        
-        ass_content = f"""[Script Info]
-Title: Video Captions
-ScriptType: v4.00+
-PlayResX: {video_width}
-PlayResY: {video_height}
-ScaledBorderAndShadow: yes
-
-[V4+ Styles]
-Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: Default,{style["font"]},{style["font_size"]},{font_color_ass},&H000000FF,{stroke_color_ass},&H80000000,{bold},0,0,0,100,100,0,0,1,{style["stroke_width"]},{1 if style.get("shadow") else 0},{alignment},20,20,{margin_v},1
-Style: Highlight,{style["font"]},{style["font_size"]},{highlight_color_ass},&H000000FF,{stroke_color_ass},&H80000000,{bold},0,0,0,100,100,0,0,1,{style["stroke_width"]},{1 if style.get("shadow") else 0},{alignment},20,20,{margin_v},1
-
-[Events]
-Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
-"""
-        
-        for segment in transcription.segments:
-            # Only use word-level timing if words exist and highlight is enabled
-            has_word_timing = config.highlight_current_word and segment.words and len(segment.words) > 0
-
-            if has_word_timing:
-                words = segment.words
-                lines = self._split_into_lines(words, config.max_words_per_line)
-
-                for line_words in lines:
-                    if not line_words:
-                        continue
-
-                    line_start = line_words[0]["start"]
-                    line_end = line_words[-1]["end"]
-
-                    for i, word in enumerate(line_words):
-                        word_start = word["start"]
-                        word_end = word["end"]
-
-                        text_parts = []
-                        for j, w in enumerate(line_words):
-                            if j == i:
-                                text_parts.append(f"{{\\rHighlight}}{w['word']}{{\\rDefault}}")
-                            else:
-                                text_parts.append(w['word'])
-
-                        text = " ".join(text_parts)
-
-                        start_time = self._format_ass_time(word_start)
-                        end_time = self._format_ass_time(word_end)
-
-                        ass_content += f"Dialogue: 0,{start_time},{end_time},Default,,0,0,0,,{text}\n"
-            else:
-                # Use segment-level timing for edited captions or when word timing not available
-                # Logic: Split text into lines based on max_words_per_line, and interpolate time for each line
-                words = segment.text.split()
-                if not words:
-                    continue
+            cmd += ["-segment_time", "1000000"]
+        cmd += ["-reset_timestamps", "1", "-segment_format", "mp4", "-y", str(pattern)]
+        await self._run_ffmpeg(cmd, stage="split")
+        return sorted(work_dir.glob("prev_*.mp4"))
 
-                # Group words into chunks
-                chunks = []
-                for i in range(0, len(words), config.max_words_per_line):
-                    chunks.append(words[i : i + config.max_words_per_line])
+    @staticmethod
+    async def _count_frames(path: Path) -> int:
+        def _probe_frames():
+            probe = ffmpeg.probe(
+                str(path),
+                select_streams="v:0",
+                count_packets=None,
+                show_entries="stream=nb_read_packets"
+            )
+            return int(probe["streams"][0]["nb_read_packets"])
+
+        try:
+            return await asyncio.to_thread(_probe_frames)
+        except ffmpeg.Error as e:
+            raise VideoProcessingError(f"Failed to count frames: {e.stderr.decode() if e.stderr else str(e)}")
+        except (KeyError, IndexError, ValueError):
+            raise VideoProcessingError(f"Could not count frames of {path.name}")
+
+    async def _concat_with_audio(self, parts: List[Path], audio_source: Path, output_path: Path) -> Path:
+        list_path = output_path.parent / f"{output_path.stem}_concat.txt"
+        with open(list_path, "w", encoding="utf-8") as f:
+            for part in parts:
+                escaped = str(part.resolve()).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = [
+            "ffmpeg",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", str(list_path),
+            "-i", str(audio_source),
+            "-map", "0:v:0",
+            "-map", "1:a?",
+            "-c", "copy",
+            "-movflags", "+faststart",
+            "-y",
+            str(output_path)
+        ]
+        try:
+            await self._run_ffmpeg(cmd, stage="concat")
+        finally:
+            if list_path.exists():
+                list_path.unlink()
+        return output_path
 
-                num_chunks = len(chunks)
-                if num_chunks == 0:
-                    continue
-                
-                segment_duration = segment.end - segment.start
-                chunk_duration = segment_duration / num_chunks
-                
-                for i, chunk_words in enumerate(chunks):
-                    # Calculate start/end time for this chunk
-                    chunk_start = segment.start + (i * chunk_duration)
-                    chunk_end = chunk_start + chunk_duration
-                    
-                    # Logic: Interpolate word timings based on character length
-                    full_text = " ".join(chunk_words)
-                    total_chars = len(full_text.replace(" ", ""))
-                    
-                    if total_chars == 0:
-                        # Fallback for empty/space-only lines
-                        text = full_text
-                    else:
-                        # Distribute time proportionally to character length
-                        text_parts = []
-                        current_time = chunk_start
-                        
-                        for w_idx, w_text in enumerate(chunk_words):
-                            w_len = len(w_text)
-                            # Calculate duration for this word
-                            # (word_len / total_chars) * total_duration
-                            w_duration = (w_len / total_chars) * chunk_duration
-                            
-                            w_start = current_time
-                            w_end = current_time + w_duration
-                            current_time += w_duration # Advance time
-                            
-                            # Construct highlight tag
-                            # Note: The loop for generating the line text needs to match the structure 
-                            # of the "word timing" block above, but we are generating the *entire line's*
-                            # karaoke tags here. 
-                            # Actually, ASS karaoke requires a specific structure. 
-                            # The loop above (lines 239-250) creates separate Dialogue events for EACH word highlight state?
-                            # No, looking at lines 243-250, it iterates through words in the line, 
-                            # and for each "i" (current word), it highlights THAT word.
-                            # So we need to do the same here: For each word in the chunk, create a Dialogue line 
-                            # where that word is highlighted.
-                            
-                            # Wait, this nested loop approach means if a line has 5 words, we generate 5 Dialogue lines 
-                            # that overlap in time? 
-                            # Let's check the original logic at lines 255:
-                            # ass_content += f"Dialogue: 0,{start_time},{end_time},..."
-                            # AND start_time/end_time are specific to that WORD.
-                            # Ah! The original logic (lines 240-255) creates a Dialogue entry for the duration of a SINGLE WORD.
-                            # And in that entry, it shows the FULL LINE, but with the specific word highlighted.
-                            # So: Time = Word Start to Word End. Text = Full Line with specific word highlighted.
-                            
-                            # So for our interpolation:
-                            # We need to iterate through words in this chunk.
-                            # For each word, define its specific start/end time.
-                            # Create a dialogue entry for THAT time range.
-                            # In that entry, verify the text has the correct highlighting tags.
-                            pass
-                        
-                        # Re-implementing the loop with correct logic
-                        current_word_start = chunk_start
-                        
-                        for w_idx, w_text in enumerate(chunk_words):
-                            w_len = len(w_text)
-                            w_duration = (w_len / total_chars) * chunk_duration
-                            w_end = current_word_start + w_duration
-                            
-                            # Construct text with highlight for THIS word
-                            line_text_parts = []
-                            for target_idx, target_word in enumerate(chunk_words):
-                                if target_idx == w_idx:
-                                    line_text_parts.append(f"{{\\rHighlight}}{target_word}{{\\rDefault}}")
-                                else:
-                                    line_text_parts.append(target_word)
-                            
-                            text = " ".join(line_text_parts)
-                            
-                            start_time = self._format_ass_time(current_word_start)
-                            end_time = self._format_ass_time(w_end)
-                             
-                            ass_content += f"Dialogue: 0,{start_time},{end_time},Default,,0,0,0,,{text}\n"
-                            
-                            current_word_start = w_end # Next word starts when this one ends
-        
-        return ass_content
-    
-    def _split_into_lines(self, words: List[dict], max_words: int) -> List[List[dict]]:
-        lines = []
-        current_line = []
-        
-        for word in words:
-            current_line.append(word)
-            if len(current_line) >= max_words:
-                lines.append(current_line)
-                current_line = []
-        
-        if current_line:
-            lines.append(current_line)
-        
-        return lines
-    
-    def _split_text_into_lines(self, text: str, max_words: int) -> List[str]:
-        words = text.split()
-        lines = []
-        
-        for i in range(0, len(words), max_words):
-            lines.append(" ".join(words[i:i + max_words]))
-        
-        return lines
-    
-    def _format_ass_time(self, seconds: float) -> str:
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        centisecs = int((seconds % 1) * 100)
-        return f"{hours}:{minutes:02d}:{secs:02d}.{centisecs:02d}"
-    
     async def add_captions(
         self,
         video_path: Path,
         output_path: Path,
         transcription: Transcription,
         config: CaptionConfig,
-        progress_callback=None
+        progress_callback=None,
+        render_profile: RenderProfile = RenderProfile.FINAL,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        output_preset: Optional[OutputPreset] = None,
+        source_offset: float = 0.0
     ) -> Path:
+        """Burn captions into ``[start, end)`` of the transcription timeline.
+
+        Transcription time ``t`` is source time ``t + source_offset``, which
+        is how clipped tasks map their rebased timestamps onto the upload.
+        """
         try:
-            logger.info("adding_captions", video_path=str(video_path))
+            logger.info(
+                "adding_captions",
+                video_path=str(video_path),
+                render_profile=render_profile.value,
+                output_preset=output_preset.value if output_preset else None,
+                start=start,
+                end=end
+            )
             
             video_info = await self.get_video_info(video_path)
+
+            lines = build_caption_lines(transcription, config)
+            if start is not None or end is not None:
+                lines = shift_caption_lines(lines, start or 0.0, end if end is not None else float("inf"))
             
-            ass_content = self._generate_ass_subtitle(
-                transcription,
-                config,
-                video_info["width"],
-                video_info["height"]
-            )
-            
-            ass_path = video_path.parent / f"{video_path.stem}_captions.ass"
-            with open(ass_path, "w", encoding="utf-8") as f:
-                f.write(ass_content)
+            ass_path = video_path.parent / f"{output_path.stem}_captions.ass"
+            if output_preset:
+                geometry, play_w, play_h = self._preset_geometry(video_info, output_preset, render_profile)
+            else:
+                geometry = self._profile_filters(video_info, render_profile)
+                play_w, play_h = video_info["width"], video_info["height"]
+
+            writer = AssSubtitleWriter(config, play_w, play_h)
+            await self._write_ass(writer, lines, ass_path)
             
             logger.info("subtitle_file_created", ass_path=str(ass_path))
-            
-            ass_path_escaped = str(ass_path).replace("\\", "/").replace(":", "\\:")
 
-            cmd = [
-                "ffmpeg",
-                "-i", str(video_path),
-                "-vf", f"ass='{ass_path_escaped}'",
-                "-c:v", "libx264",
-                "-profile:v", "high",
-                "-level", "4.0",
-                "-crf", "23",
-                "-pix_fmt", "yuv420p",
+            filters = [*geometry, self._ass_filter(ass_path)]
+            duration = (end if end is not None else video_info["duration"]) - (start or 0.0)
+            progress = RenderProgress(progress_callback, duration)
+
+            cmd = ["ffmpeg"]
+            seek = source_offset + (start or 0.0)
+            if seek:
+                cmd += ["-ss", f"{seek:.3f}"]
+            cmd += ["-i", str(video_path)]
+            if end is not None:
+                cmd += ["-t", f"{end - (start or 0.0):.3f}"]
+            cmd += [
+                "-vf", ",".join(filters),
+                *self._encoder_args(render_profile),
                 "-c:a", "copy",
                 "-movflags", "+faststart",
                 "-y",
                 str(output_path)
             ]
             
-            def _run_ffmpeg_cmd():
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True
-                )
-                return process.communicate(), process.returncode
-
-            (stdout, stderr), returncode = await asyncio.to_thread(_run_ffmpeg_cmd)
-
-            if returncode != 0:
-                logger.error(
-                    "ffmpeg_failed",
-                    returncode=process.returncode,
-                    stderr=stderr,
-                    stdout=stdout
-                )
-                raise VideoProcessingError(f"FFmpeg failed: {stderr}")
+            try:
+                await self._run_ffmpeg(cmd, progress.reporter())
+            finally:
+                if ass_path.exists():
+                    ass_path.unlink()
 
             if not Path(output_path).exists():
                 logger.error("output_file_not_created", output_path=str(output_path))
                 raise VideoProcessingError(f"Output video file was not created: {output_path}")
 
-            if ass_path.exists():
-                ass_path.unlink()
-
             logger.info("captions_added", output_path=str(output_path))
             return output_path
 
@@ -461,6 +665,392 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
             logger.error("caption_rendering_failed", error=str(e), video_path=str(video_path))
             raise VideoProcessingError(f"Failed to add captions: {str(e)}")
 
+    async def add_captions_variants(
+        self,
+        video_path: Path,
+        variants: List[RenderVariant],
+        output_paths: List[Path],
+        transcription: Transcription,
+        render_profile: RenderProfile = RenderProfile.FINAL,
+        progress_callback=None,
+        source_offset: float = 0.0,
+        duration: Optional[float] = None
+    ) -> List[dict]:
+        """Render several caption styles/sizes from one decode of the source.
+
+        The decoded frames are split once per variant inside a single filter
+        graph; each branch gets its own scale/crop, ASS overlay and encoder.
+        ``source_offset``/``duration`` select a clip of the source.
+        """
+        logger.info("adding_caption_variants", video_path=str(video_path), variants=len(variants))
+        video_info = await self.get_video_info(video_path)
+
+        ass_paths: List[Path] = []
+        branches = []
+        results = []
+        for i, (variant, output_path) in enumerate(zip(variants, output_paths)):
+            if variant.preset:
+                geometry, play_w, play_h = self._preset_geometry(video_info, variant.preset, render_profile)
+            else:
+                geometry, play_w, play_h = self._variant_geometry(video_info, variant.width, variant.height, variant.crop)
+            if render_profile == RenderProfile.PREVIEW and not variant.preset:
+                # Sized variants already pick their resolution; only cap the frame rate.
+                if not geometry:
+                    geometry = self._profile_filters(video_info, render_profile)
+                elif video_info["fps"] > self.settings.preview_max_fps:
+                    geometry.append(f"fps={self.settings.preview_max_fps}")
+
+            ass_path = video_path.parent / f"{output_path.stem}_captions.ass"
+            lines = build_caption_lines(transcription, variant.caption_config)
+            writer = AssSubtitleWriter(variant.caption_config, play_w, play_h)
+            await self._write_ass(writer, lines, ass_path)
+            ass_paths.append(ass_path)
+
+            branches.append(f"[v{i}]" + ",".join([*geometry, self._ass_filter(ass_path)]) + f"[out{i}]")
+            results.append({
+                "name": variant.name,
+                "output_path": output_path,
+                "width": variant.width,
+                "height": variant.height,
+                "preset": variant.preset.value if variant.preset else None,
+            })
+
+        labels = "".join(f"[v{i}]" for i in range(len(variants)))
+        filter_graph = ";".join([f"[0:v]split={len(variants)}{labels}", *branches])
+
+        cmd = ["ffmpeg"]
+        if source_offset:
+            cmd += ["-ss", f"{source_offset:.3f}"]
+        if duration is not None:
+            cmd += ["-t", f"{duration:.3f}"]
+        cmd += ["-i", str(video_path), "-filter_complex", filter_graph]
+        for i, output_path in enumerate(output_paths):
+            cmd += [
+                "-map", f"[out{i}]",
+                "-map", "0:a?",
+                *self._encoder_args(render_profile),
+                "-c:a", "copy",
+                "-movflags", "+faststart",
+                "-y",
+                str(output_path)
+            ]
+
+        progress = RenderProgress(progress_callback, duration if duration is not None else video_info["duration"])
+        try:
+            await self._run_ffmpeg(cmd, progress.reporter())
+        except VideoProcessingError as e:
+            logger.error("caption_variants_failed", error=str(e), video_path=str(video_path))
+            raise VideoProcessingError(f"Failed to render caption variants: {str(e)}")
+        finally:
+            for ass_path in ass_paths:
+                if ass_path.exists():
+                    ass_path.unlink()
+
+        for result in results:
+            if not result["output_path"].exists():
+                raise VideoProcessingError(f"Output video file was not created: {result['output_path']}")
+
+        logger.info("caption_variants_added", outputs=[str(p) for p in output_paths])
+        return results
+
+    async def render_frame(
+        self,
+        video_path: Path,
+        output_path: Path,
+        transcription: Transcription,
+        config: CaptionConfig,
+        timestamp: float,
+        source_offset: float = 0.0,
+        duration: Optional[float] = None
+    ) -> Path:
+        """Render the single frame at ``timestamp`` with captions burned in.
+
+        Only the caption lines visible at that moment are written to the ASS
+        script. ``-copyts`` keeps source timestamps after the input seek, so
+        karaoke highlight timings apply exactly as in a full render.
+        """
+        video_info = await self.get_video_info(video_path)
+        if duration is None:
+            duration = video_info["duration"] - source_offset
+        last_frame = max(duration - 1 / max(video_info["fps"], 1.0), 0.0)
+        timestamp = min(max(timestamp, 0.0), last_frame)
+
+        lines = [
+            line for line in build_caption_lines(transcription, config)
+            if line.start <= timestamp < line.end
+        ]
+        if source_offset:
+            # Move the lines onto the source timeline the copied timestamps use.
+            lines = shift_caption_lines(lines, -source_offset, float("inf"))
+
+        ass_path = None
+        cmd = ["ffmpeg", "-ss", f"{timestamp + source_offset:.3f}", "-copyts", "-i", str(video_path)]
+        if lines:
+            ass_path = output_path.parent / f"{output_path.stem}_captions.ass"
+            writer = AssSubtitleWriter(config, video_info["width"], video_info["height"])
+            await self._write_ass(writer, lines, ass_path)
+            cmd += ["-vf", self._ass_filter(ass_path)]
+        cmd += ["-frames:v", "1", "-update", "1", "-q:v", "2", "-y", str(output_path)]
+
+        try:
+            await self._run_ffmpeg(cmd, stage="frame")
+        except VideoProcessingError as e:
+            logger.error("frame_render_failed", error=str(e), video_path=str(video_path))
+            raise VideoProcessingError(f"Failed to render preview frame: {str(e)}")
+        finally:
+            if ass_path is not None and ass_path.exists():
+                ass_path.unlink()
+
+        if not output_path.exists():
+            raise VideoProcessingError(f"Preview frame was not created: {output_path}")
+        return output_path
+
+    async def mux_subtitles(
+        self,
+        video_path: Path,
+        output_path: Path,
+        transcription: Transcription,
+        config: CaptionConfig,
+        progress_callback=None
+    ) -> dict:
+        """Attach captions as a subtitle track, stream-copying audio and video."""
+        suffix = output_path.suffix.lower()
+        if suffix not in self.SOFT_SUBTITLE_FORMATS:
+            output_path = output_path.with_suffix(".mkv")
+            suffix = ".mkv"
+        subtitle_format, codec = self.SOFT_SUBTITLE_FORMATS[suffix]
+
+        logger.info("muxing_subtitles", video_path=str(video_path), container=suffix[1:], codec=codec)
+
+        video_info = await self.get_video_info(video_path)
+        lines = build_caption_lines(transcription, config)
+        if subtitle_format == "ass":
+            content = AssSubtitleWriter(config, video_info["width"], video_info["height"]).render(lines)
+        elif subtitle_format == "srt":
+            content = render_srt(lines)
+        else:
+            content = render_webvtt(lines)
+
+        subtitle_path = video_path.parent / f"{output_path.stem}_captions.{subtitle_format}"
+        await asyncio.to_thread(subtitle_path.write_text, content, encoding="utf-8")
+
+        cmd = [
+            "ffmpeg",
+            # AVI and raw streams lack timestamps that MKV needs for stream copy
+            "-fflags", "+genpts",
+            "-i", str(video_path),
+            "-i", str(subtitle_path),
+            "-map", "0:v",
+            "-map", "0:a?",
+            "-map", "1:0",
+            "-c", "copy",
+            "-c:s", codec,
+            "-disposition:s:0", "default",
+        ]
+        if suffix in (".mp4", ".m4v", ".mov"):
+            cmd += ["-movflags", "+faststart"]
+        cmd += ["-y", str(output_path)]
+
+        progress = RenderProgress(progress_callback, video_info["duration"])
+        try:
+            await self._run_ffmpeg(cmd, progress.reporter(), stage="mux")
+        except VideoProcessingError as e:
+            logger.error("subtitle_mux_failed", error=str(e), video_path=str(video_path))
+            raise VideoProcessingError(f"Failed to mux subtitles: {str(e)}")
+        finally:
+            if subtitle_path.exists():
+                subtitle_path.unlink()
+
+        logger.info("subtitles_muxed", output_path=str(output_path), codec=codec)
+        return {
+            "output_path": output_path,
+            "container": suffix[1:],
+            "subtitle_codec": codec,
+            "lines": len(lines),
+        }
+
+    async def add_captions_chunked(
+        self,
+        video_path: Path,
+        output_path: Path,
+        transcription: Transcription,
+        config: CaptionConfig,
+        chunks: Optional[int] = None,
+        progress_callback=None
+    ) -> Optional[dict]:
+        """Split the source at keyframes and encode the chunks in parallel.
+
+        Each chunk gets the caption lines of its window shifted to start at
+        zero; chunks are joined with the concat demuxer and the source audio is
+        muxed once. Returns ``None`` when the video is too short to be worth it.
+        """
+        chunks = chunks or self.settings.render_parallel_chunks
+        video_info = await self.get_video_info(video_path)
+        duration = video_info["duration"]
+        if chunks < 2 or duration < self.settings.render_chunk_min_seconds:
+            return None
+
+        keyframes = await self.get_keyframe_times(video_path)
+        cuts: List[float] = []
+        for i in range(1, chunks):
+            target = duration * i / chunks
+            nearest = min(keyframes, key=lambda k: abs(k - target), default=None)
+            if nearest is not None and EPSILON < nearest < duration - EPSILON and nearest not in cuts:
+                cuts.append(nearest)
+        cuts.sort()
+        if not cuts:
+            return None
+
+        bounds = [0.0, *cuts, None]
+        threads = max(1, (os.cpu_count() or 1) // (len(bounds) - 1))
+        lines = build_caption_lines(transcription, config)
+
+        logger.info(
+            "chunked_render_started",
+            video_path=str(video_path),
+            chunks=len(bounds) - 1,
+            threads_per_chunk=threads
+        )
+
+        progress = RenderProgress(progress_callback, duration)
+        work_dir = Path(self.settings.temp_dir) / f"{output_path.stem}_chunks"
+        work_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            parts = await asyncio.gather(*(
+                self._encode_range(
+                    video_path,
+                    work_dir / f"chunk_{i:04d}.mp4",
+                    lines,
+                    config,
+                    video_info,
+                    start,
+                    end,
+                    threads=threads,
+                    on_progress=progress.reporter(f"chunk_{i}")
+                )
+                for i, (start, end) in enumerate(zip(bounds, bounds[1:]))
+            ))
+            await self._concat_with_audio(list(parts), video_path, output_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        logger.info("chunked_render_completed", output_path=str(output_path))
+        return {"mode": "chunked", "chunks": len(parts)}
+
+    async def add_captions_incremental(
+        self,
+        video_path: Path,
+        output_path: Path,
+        previous_output: Path,
+        previous_transcription: Transcription,
+        transcription: Transcription,
+        config: CaptionConfig,
+        progress_callback=None
+    ) -> Optional[dict]:
+        """Re-render only the GOPs of ``previous_output`` whose captions changed.
+
+        Changed ranges are re-encoded from the source, the rest is stream-copied
+        from the previous render, and the source audio is muxed once. Returns
+        ``None`` when a full render would be cheaper.
+        """
+        lines = build_caption_lines(transcription, config)
+        intervals = changed_intervals(build_caption_lines(previous_transcription, config), lines)
+
+        previous_info = await self.get_video_info(previous_output)
+        duration = previous_info["duration"]
+        if not intervals:
+            ranges = [RenderRange(start=0.0, end=duration, reencode=False)]
+        else:
+            keyframes = await self.get_keyframe_times(previous_output)
+            ranges = plan_ranges(keyframes, duration, intervals)
+
+        reencoded = sum(r.duration for r in ranges if r.reencode)
+        ratio = reencoded / duration if duration else 1.0
+        if ratio > self.settings.incremental_render_max_changed_ratio:
+            logger.info("incremental_render_skipped", changed_ratio=round(ratio, 3))
+            return None
+
+        logger.info(
+            "incremental_render_started",
+            video_path=str(video_path),
+            ranges=len(ranges),
+            reencoded_seconds=round(reencoded, 2),
+            changed_ratio=round(ratio, 3)
+        )
+
+        video_info = await self.get_video_info(video_path)
+        fps = previous_info["fps"]
+        total_frames = await self._count_frames(previous_output)
+        # Frame index each range starts at; the last range runs to the final frame.
+        frame_bounds = [int(round(r.start * fps)) for r in ranges] + [total_frames]
+        progress = RenderProgress(progress_callback, reencoded)
+        work_dir = Path(self.settings.temp_dir) / f"{output_path.stem}_parts"
+        work_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            copied = await self._split_at_keyframes(
+                previous_output,
+                [r.start for r in ranges[1:]],
+                work_dir,
+                1 / fps
+            )
+            if len(copied) != len(ranges):
+                raise VideoProcessingError(
+                    "Previous render did not split on the expected keyframes",
+                    details={"expected": len(ranges), "got": len(copied)}
+                )
+
+            parts = []
+            for i, (render_range, copied_part) in enumerate(zip(ranges, copied)):
+                if not render_range.reencode:
+                    parts.append(copied_part)
+                    continue
+                end = render_range.end if i < len(ranges) - 1 else None
+                parts.append(await self._encode_range(
+                    video_path,
+                    work_dir / f"part_{i:04d}.mp4",
+                    lines,
+                    config,
+                    video_info,
+                    render_range.start,
+                    end,
+                    on_progress=progress.reporter(f"range_{i}")
+                ))
+
+            # A piece that starts or ends on the wrong frame would shift
+            # everything after it against the audio; let the caller render in full.
+            for i, part in enumerate(parts):
+                frames = await self._count_frames(part)
+                expected = frame_bounds[i + 1] - frame_bounds[i]
+                if frames != expected:
+                    raise VideoProcessingError(
+                        "Incremental render piece does not match its planned range",
+                        details={
+                            "range": i,
+                            "start": ranges[i].start,
+                            "end": ranges[i].end,
+                            "expected_frames": expected,
+                            "frames": frames,
+                        }
+                    )
+
+            await self._concat_with_audio(parts, video_path, output_path)
+            frames = await self._count_frames(output_path)
+            if frames != total_frames:
+                raise VideoProcessingError(
+                    "Incremental render frame count differs from the previous render",
+                    details={"expected_frames": total_frames, "frames": frames}
+                )
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        logger.info("incremental_render_completed", output_path=str(output_path))
+        return {
+            "mode": "incremental",
+            "ranges": len(ranges),
+            "reencoded_seconds": round(reencoded, 3),
+            "changed_ratio": round(ratio, 4),
+        }
+
 
 _video_processor: Optional[VideoProcessor] = None
 
@@ -0,0 +1,81 @@
+"""Compare the karaoke and per-word ASS engines on a large transcription.
+
+Usage:
+    python -m benchmarks.bench_ass_generation [--segments 10000] [--render-seconds 120]
+
+Reports events, bytes and generation time for both engines. When ffmpeg is on
+PATH, also times libass rendering of the first ``--render-seconds`` over a
+blank 1080x1920 source.
+"""
+import argparse
+import shutil
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from app.models import Transcription, TranscriptionSegment
+from app.schemas import CaptionConfig
+from app.services.subtitles import AssSubtitleWriter, build_caption_lines
+
+WORDS = "the quick brown fox jumps over a lazy dog while captions render".split()
+
+
+def synthetic_transcription(segments: int, words_per_segment: int = 10) -> Transcription:
+    result = []
+    t = 0.0
+    for i in range(segments):
+        words = []
+        for j in range(words_per_segment):
+            words.append({"word": WORDS[(i + j) % len(WORDS)], "start": t, "end": t + 0.25})
+            t += 0.3
+        result.append(TranscriptionSegment(
+            start=words[0]["start"],
+            end=words[-1]["end"],
+            text=" ".join(w["word"] for w in words),
+            words=words
+        ))
+        t += 0.5
+    return Transcription(segments=result, language="en", duration=t)
+
+
+def render_seconds(ass_path: Path, seconds: float) -> float:
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"color=black:s=1080x1920:r=30:d={seconds}",
+        "-vf", f"ass={ass_path}",
+        "-f", "null", "-"
+    ]
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--segments", type=int, default=10000)
+    parser.add_argument("--render-seconds", type=float, default=120.0)
+    args = parser.parse_args()
+
+    transcription = synthetic_transcription(args.segments)
+    config = CaptionConfig(max_words_per_line=5)
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+
+    print(f"segments: {args.segments}, duration: {transcription.duration:.0f}s")
+    print(f"{'engine':<10} {'events':>8} {'bytes':>11} {'gen ms':>8} {'render s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for engine in AssSubtitleWriter.ENGINES:
+            writer = AssSubtitleWriter(config, 1080, 1920, engine=engine)
+            start = time.perf_counter()
+            lines = build_caption_lines(transcription, config)
+            ass_path = writer.write(lines, Path(tmp) / f"{engine}.ass")
+            gen_ms = (time.perf_counter() - start) * 1000
+
+            content = ass_path.read_text(encoding="utf-8")
+            events = content.count("\nDialogue:")
+            render = f"{render_seconds(ass_path, args.render_seconds):.2f}" if has_ffmpeg else "n/a"
+            print(f"{engine:<10} {events:>8} {len(content.encode()):>11} {gen_ms:>8.1f} {render:>9}")
+
+
+if __name__ == "__main__":
+    main()
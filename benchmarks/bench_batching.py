@@ -0,0 +1,64 @@
+"""Compare serial transcription with cross-job batching on short clips.
+
+Usage:
+    python -m benchmarks.bench_batching clip.wav [--clips 16] [--batch-size 8] [--max-wait-ms 200]
+
+The same clip is submitted ``--clips`` times concurrently, first through the
+regular per-task path, then through ``TranscriptionBatcher``. Reports clips per
+second and mean per-clip latency for both.
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+import whisper
+
+from app.services.transcription import get_transcription_service
+from app.services.transcription_batcher import TranscriptionBatcher
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def run(clip: Path, clips: int, batch_size: int, max_wait_ms: int):
+    service = get_transcription_service()
+    _ = service.model
+    audio_seconds = len(whisper.load_audio(str(clip))) / whisper.audio.SAMPLE_RATE
+
+    service.batcher = None
+    start = time.perf_counter()
+    serial_latency = [await timed(service.transcribe(clip)) for _ in range(clips)]
+    serial = time.perf_counter() - start
+
+    service.batcher = TranscriptionBatcher(
+        service,
+        max_batch_size=batch_size,
+        max_wait_ms=max_wait_ms,
+        max_clip_seconds=max(audio_seconds, 1.0)
+    )
+    start = time.perf_counter()
+    batched_latency = await asyncio.gather(*(timed(service.transcribe(clip)) for _ in range(clips)))
+    batched = time.perf_counter() - start
+
+    print(f"clip: {audio_seconds:.1f}s x {clips}, batch size {batch_size}, max wait {max_wait_ms}ms")
+    print(f"serial:  {clips / serial:6.2f} clips/s, mean latency {sum(serial_latency) / clips:.2f}s")
+    print(f"batched: {clips / batched:6.2f} clips/s, mean latency {sum(batched_latency) / clips:.2f}s")
+    print(f"throughput gain: {serial / batched:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clip", type=Path)
+    parser.add_argument("--clips", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.clip, args.clips, args.batch_size, args.max_wait_ms))
+
+
+if __name__ == "__main__":
+    main()
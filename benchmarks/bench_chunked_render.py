@@ -0,0 +1,75 @@
+"""Wall-clock scaling of keyframe-chunked caption rendering.
+
+Usage:
+    python -m benchmarks.bench_chunked_render video.mp4 [--chunks 1 2 4 8]
+
+Renders the same synthetic word-timed transcription over ``video.mp4`` once
+with the single-process encoder and once per chunk count, printing the
+wall-clock time and speedup of each. Videos shorter than
+``RENDER_CHUNK_MIN_SECONDS`` are not chunked; lower it for short fixtures.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from app.models import Transcription, TranscriptionSegment
+from app.schemas import CaptionConfig
+from app.services.video_processor import get_video_processor
+
+WORDS = "the quick brown fox jumps over a lazy dog while captions render".split()
+
+
+def synthetic_transcription(duration: float) -> Transcription:
+    segments = []
+    t = 0.0
+    while t + 3.0 < duration:
+        words = [
+            {"word": WORDS[(int(t) + j) % len(WORDS)], "start": t + j * 0.3, "end": t + j * 0.3 + 0.25}
+            for j in range(8)
+        ]
+        segments.append(TranscriptionSegment(
+            start=words[0]["start"],
+            end=words[-1]["end"],
+            text=" ".join(w["word"] for w in words),
+            words=words
+        ))
+        t += 3.0
+    return Transcription(segments=segments, language="en", duration=duration)
+
+
+async def run(video: Path, chunk_counts: list[int]):
+    processor = get_video_processor()
+    info = await processor.get_video_info(video)
+    transcription = synthetic_transcription(info["duration"])
+    config = CaptionConfig()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        await processor.add_captions(video, Path(tmp) / "single.mp4", transcription, config)
+        baseline = time.perf_counter() - start
+        print(f"video: {info['duration']:.1f}s {info['width']}x{info['height']}")
+        print(f"{'mode':<12} {'seconds':>8} {'speedup':>8}")
+        print(f"{'single':<12} {baseline:>8.2f} {1.0:>8.2f}")
+
+        for chunks in chunk_counts:
+            start = time.perf_counter()
+            stats = await processor.add_captions_chunked(
+                video, Path(tmp) / f"chunked_{chunks}.mp4", transcription, config, chunks=chunks
+            )
+            elapsed = time.perf_counter() - start
+            label = f"chunks={stats['chunks']}" if stats else f"chunks={chunks} (skipped)"
+            print(f"{label:<12} {elapsed:>8.2f} {baseline / elapsed:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video", type=Path)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+    asyncio.run(run(args.video, args.chunks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Compare the ASGI request-logging middleware with the BaseHTTPMiddleware version.
+
+Usage:
+    python -m benchmarks.bench_request_middleware [--requests 2000] [--file-mb 256]
+
+Both variants wrap the same app with a small JSON route and a FileResponse
+route. Requests go through httpx's in-process ASGI transport, so the numbers
+cover only application and middleware overhead, not the network. That
+transport collects the whole body before returning it, which understates
+the gain for file downloads behind a real server.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import structlog
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import FileResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.logging import RequestLoggingMiddleware
+
+
+class BaseHTTPRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here as the baseline."""
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        request_id = str(uuid.uuid4())[:8]
+        start_time = time.time()
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(request_id=request_id, method=request.method, path=request.url.path)
+        response = await call_next(request)
+        duration_ms = (time.time() - start_time) * 1000
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-Response-Time"] = f"{duration_ms:.2f}ms"
+        return response
+
+
+def build_app(middleware, file_path: Path) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware)
+
+    @app.get("/json")
+    async def small_json():
+        return {"status": "ok", "progress": 42.0, "message": "Transcribing audio"}
+
+    @app.get("/file")
+    async def large_file():
+        return FileResponse(file_path, media_type="video/mp4")
+
+    return app
+
+
+async def bench_json_latency(client: httpx.AsyncClient, requests: int):
+    """Sequential requests, so latency excludes queueing behind other requests."""
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get("/json")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+async def bench_json_throughput(client: httpx.AsyncClient, requests: int, concurrency: int = 16):
+    async def worker(count: int):
+        for _ in range(count):
+            (await client.get("/json")).raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    return requests // concurrency * concurrency / (time.perf_counter() - started)
+
+
+async def bench_file(client: httpx.AsyncClient, size: int, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        received = 0
+        async with client.stream("GET", "/file") as response:
+            async for chunk in response.aiter_raw():
+                received += len(chunk)
+        assert received == size
+        best = min(best, time.perf_counter() - started)
+    return size / best / 1024 / 1024
+
+
+async def run(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "video.mp4"
+        size = args.file_mb * 1024 * 1024
+        with open(file_path, "wb") as f:
+            f.write(os.urandom(size))
+
+        for name, middleware in (
+            ("BaseHTTPMiddleware", BaseHTTPRequestLoggingMiddleware),
+            ("pure ASGI", RequestLoggingMiddleware),
+        ):
+            transport = httpx.ASGITransport(app=build_app(middleware, file_path))
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                await bench_json_latency(client, 200)
+                p50, p99 = await bench_json_latency(client, args.requests)
+                rps = await bench_json_throughput(client, args.requests)
+                throughput = await bench_file(client, size)
+            print(
+                f"{name:20} json: {rps:7.0f} req/s  p50 {p50 * 1000:6.2f}ms  p99 {p99 * 1000:6.2f}ms"
+                f"   file: {throughput:7.0f} MB/s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--file-mb", type=int, default=256)
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Index build time, memory and query latency of the transcription search index.
+
+Usage:
+    python -m benchmarks.bench_search [--tasks 1000] [--words-per-task 1000] [--memory]
+
+Builds synthetic transcriptions (Zipf-distributed vocabulary, so common
+words have long posting lists), indexes them, then times single-word,
+phrase and prefix queries. ``--memory`` traces allocations during the
+build, which makes the build itself several times slower.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.models import Transcription, TranscriptionSegment
+from app.services.search_index import TranscriptionSearchIndex
+
+VOCABULARY_SIZE = 50000
+WORDS_PER_SEGMENT = 10
+
+
+def synthetic_transcription(rng: random.Random, vocabulary, weights, words: int) -> Transcription:
+    segments = []
+    t = 0.0
+    tokens = rng.choices(vocabulary, weights=weights, k=words)
+    for i in range(0, words, WORDS_PER_SEGMENT):
+        segment_words = []
+        for token in tokens[i:i + WORDS_PER_SEGMENT]:
+            segment_words.append({"word": token, "start": t, "end": t + 0.25})
+            t += 0.3
+        segments.append(TranscriptionSegment(
+            start=segment_words[0]["start"],
+            end=segment_words[-1]["end"],
+            text=" ".join(w["word"] for w in segment_words),
+            words=segment_words
+        ))
+    return Transcription(segments=segments, language="en", duration=t)
+
+
+def time_query(index: TranscriptionSearchIndex, query: str, repeat: int = 20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        hits, truncated = index.search(query, limit=50)
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"  {query!r:28} {len(hits):3d} hits{'+' if truncated else ' '} {elapsed * 1000:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--words-per-task", type=int, default=1000)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = [f"term{i}" for i in range(VOCABULARY_SIZE)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    transcriptions = [
+        synthetic_transcription(rng, vocabulary, weights, args.words_per_task)
+        for _ in range(args.tasks)
+    ]
+
+    index = TranscriptionSearchIndex()
+    if args.memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    for i, transcription in enumerate(transcriptions):
+        index.index(f"task-{i}", transcription)
+    build_seconds = time.perf_counter() - started
+
+    print(f"indexed {index.word_count} words from {args.tasks} tasks, {len(index.vocabulary)} terms")
+    print(f"build {build_seconds:.2f}s")
+    if args.memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"peak index memory {peak / 1024 / 1024:.0f} MB")
+
+    started = time.perf_counter()
+    index.index("task-0", transcriptions[0])
+    print(f"re-index one task {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    print("queries (limit 50):")
+    time_query(index, "term0")
+    time_query(index, "term4321")
+    time_query(index, "term0 term1")
+    time_query(index, "term12 term7 term3")
+    time_query(index, "term49999")
+    time_query(index, "term123*")
+    time_query(index, "term1*")
+    time_query(index, "missing")
+
+
+if __name__ == "__main__":
+    main()
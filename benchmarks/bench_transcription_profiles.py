@@ -0,0 +1,50 @@
+"""Report transcription real-time factor for each decoding profile.
+
+Usage:
+    python -m benchmarks.bench_transcription_profiles audio.wav [--language en] [--repeat 2]
+
+The input should be 16 kHz mono PCM (as produced by ``VideoProcessor.ingest``).
+RTF is wall-clock transcription time divided by audio duration; lower is faster.
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from app.schemas import TranscriptionProfile
+from app.services.transcription import get_transcription_service
+from app.services.vad import SAMPLE_RATE, VoiceActivityDetector
+
+
+async def run(audio_path: Path, language: str, repeat: int):
+    service = get_transcription_service()
+    _ = service.model
+    audio_seconds = len(VoiceActivityDetector.load_audio(audio_path)) / SAMPLE_RATE
+
+    print(f"audio: {audio_seconds:.1f}s, model: {service.model_name}, language: {language or 'auto'}")
+    print(f"{'profile':<10} {'seconds':>9} {'rtf':>7} {'segments':>9} {'words':>7}")
+    for profile in TranscriptionProfile:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            transcription = await service.transcribe(audio_path, language=language, profile=profile)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        words = sum(len(seg.words) for seg in transcription.segments)
+        print(
+            f"{profile.value:<10} {best:>9.2f} {best / audio_seconds:>7.3f} "
+            f"{len(transcription.segments):>9} {words:>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("audio", type=Path)
+    parser.add_argument("--language", default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args.audio, args.language, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Benchmark the VAD pre-pass on silence-heavy audio.
+
+Usage:
+    python -m benchmarks.bench_vad [speech.wav] [--silence-ratio 0.7] [--minutes 5]
+
+Builds a fixture by interleaving a speech clip (16 kHz mono WAV) with long
+stretches of low-level noise, then transcribes it with and without the VAD
+stage. Without a speech clip, synthetic voiced bursts are used and only the
+VAD timings are meaningful.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from app.services.vad import SAMPLE_RATE, VoiceActivityDetector
+
+
+def synthetic_speech(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 3 * t))
+    return (0.3 * envelope * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+
+
+def build_fixture(speech: np.ndarray, minutes: float, silence_ratio: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    total = int(minutes * 60 * SAMPLE_RATE)
+    speech_len = min(len(speech), int(10 * SAMPLE_RATE))
+    silence_len = int(speech_len * silence_ratio / (1 - silence_ratio))
+    pieces, size = [], 0
+    while size < total:
+        start = rng.integers(0, max(len(speech) - speech_len, 1))
+        pieces.append(speech[start:start + speech_len])
+        pieces.append((rng.standard_normal(silence_len) * 0.002).astype(np.float32))
+        size += speech_len + silence_len
+    return np.concatenate(pieces)[:total]
+
+
+def write_wav(path: Path, audio: np.ndarray) -> None:
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+async def transcribe(audio_path: Path, use_vad: bool) -> float:
+    from app.services.transcription import get_transcription_service
+
+    service = get_transcription_service()
+    _ = service.model
+    regions = None
+    start = time.perf_counter()
+    if use_vad:
+        _, regions = await VoiceActivityDetector().detect_file(audio_path)
+    await service.transcribe(audio_path, speech_regions=regions)
+    return time.perf_counter() - start
+
+
+async def compare(audio_path: Path):
+    return await transcribe(audio_path, use_vad=False), await transcribe(audio_path, use_vad=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("speech", nargs="?", type=Path)
+    parser.add_argument("--silence-ratio", type=float, default=0.7)
+    parser.add_argument("--minutes", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.speech:
+        speech = VoiceActivityDetector.load_audio(args.speech)
+    else:
+        speech = synthetic_speech(10.0)
+    audio = build_fixture(speech, args.minutes, args.silence_ratio)
+
+    vad = VoiceActivityDetector()
+    start = time.perf_counter()
+    regions = vad.detect(audio)
+    vad_seconds = time.perf_counter() - start
+    speech_seconds = sum(r.duration for r in regions)
+    total_seconds = len(audio) / SAMPLE_RATE
+
+    print(f"audio: {total_seconds:.1f}s, silence ratio {args.silence_ratio:.0%}")
+    print(f"vad: {len(regions)} regions, {speech_seconds:.1f}s speech "
+          f"({speech_seconds / total_seconds:.0%}), {vad_seconds * 1000:.1f}ms")
+
+    try:
+        import whisper  # noqa: F401
+    except ImportError:
+        print("whisper not installed, skipping transcription timings")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_path = Path(tmp) / "fixture.wav"
+        write_wav(audio_path, audio)
+        full, pruned = asyncio.run(compare(audio_path))
+
+    print(f"transcribe full: {full:.2f}s (RTF {full / total_seconds:.3f})")
+    print(f"transcribe vad:  {pruned:.2f}s (RTF {pruned / total_seconds:.3f})")
+    print(f"speedup: {full / pruned:.2f}x")
+
+
+if __name__ == "__main__":
+    main()